@@ -1,7 +1,9 @@
 import pandas as pd
 import numpy as np
 
-df = pd.read_csv("tomates_calidad.csv")
+import overlays
+
+df = pd.read_csv(overlays.BASE_CSV, usecols=[overlays.CLAVE, "diametro_mm"])
 
 X = df["diametro_mm"].values
 
@@ -14,6 +16,8 @@ sigma = 5.0  # ruido relativamente chico → r alto y homocedástico
 np.random.seed(42)  # para que sea reproducible
 eps = np.random.normal(loc=0, scale=sigma, size=len(X))
 
-df["peso_g"] = a + b * X + eps
+peso_g = a + b * X + eps
 
-df.to_csv("tomates_calidad_regenerado.csv", index=False)
+# Solo se guarda la columna nueva (overlays/regenerado/peso_g.npy),
+# no una copia entera del CSV
+overlays.guardar_columna(overlays.ESCENARIO_REGENERADO, "peso_g", df[overlays.CLAVE].values, peso_g)
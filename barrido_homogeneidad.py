@@ -0,0 +1,106 @@
+"""
+Barrido de sensibilidad de la prueba de homogeneidad (test_homogeneidad.py)
+sobre el número de clases por cuantiles Q y el nivel de significación alfa.
+
+En lugar de correr el script una vez por cada Q (leer CSV, qcut, crosstab),
+los diámetros se ordenan UNA sola vez junto con el productor de cada tomate
+y se arma el conteo acumulado por productor:
+
+    acum[j, i] = nº de tomates del productor j entre los i más chicos
+
+Para cada Q, los bordes de clase son los cuantiles k/Q del vector ordenado
+(mismo cálculo que pd.qcut, descartando bordes repetidos) y la
+posición de cada borde sale con una búsqueda binaria. Las frecuencias
+observadas de la clase (b_k, b_{k+1}] son entonces
+
+    O[k, j] = acum[j, pos_{k+1}] - acum[j, pos_k]
+
+así que el costo por Q es O(Q * productores) y el barrido completo cuesta
+prácticamente lo mismo que una corrida.
+
+Para cada par (Q, alfa) se informa: X^2, gl, p-valor, X^2 crítico, decisión,
+frecuencia esperada mínima y nº de celdas con E_ij < 5.
+"""
+
+import numpy as np
+import pandas as pd
+from scipy.stats import chi2
+
+import cache_resultados as cache
+from test_homogeneidad import CSV_PATH
+
+Q_VALORES = range(3, 51)
+ALFAS = (0.01, 0.05, 0.10)
+
+
+def preparar_orden(path=CSV_PATH):
+    """
+    Lee el CSV y devuelve (x_ordenado, acum, productores), con acum de
+    forma (productores, n + 1).
+    """
+    df = pd.read_csv(path, usecols=["lote_proveedor", "diametro_mm"])
+    df = df.dropna(subset=["lote_proveedor", "diametro_mm"])
+
+    x = df["diametro_mm"].astype(float).values
+    codigos, productores = pd.factorize(df["lote_proveedor"], sort=True)
+
+    orden = np.argsort(x, kind="stable")
+    x_ordenado = x[orden]
+    codigos = codigos[orden]
+
+    indicadoras = np.zeros((len(productores), len(x) + 1), dtype=np.int64)
+    indicadoras[codigos, np.arange(1, len(x) + 1)] = 1
+    acum = np.cumsum(indicadoras, axis=1)
+    return x_ordenado, acum, list(productores)
+
+
+def tabla_q(x_ordenado, acum, q):
+    """Tabla de contingencia (clases x productor) para q clases por cuantiles."""
+    # mismos cuantiles que pd.qcut: k/q redondeado hacia arriba si no es
+    # representable en binario, para que los bordes coincidan exactamente
+    cuantiles = np.linspace(0, 1, q + 1)
+    np.putmask(cuantiles, q * cuantiles != np.arange(q + 1), np.nextafter(cuantiles, 1))
+    bordes = np.unique(np.quantile(x_ordenado, cuantiles))
+    pos = np.searchsorted(x_ordenado, bordes, side="right")
+    pos[0] = 0                       # la primera clase incluye al mínimo
+    O = (acum[:, pos[1:]] - acum[:, pos[:-1]]).T
+    return O[O.sum(axis=1) > 0].astype(float)
+
+
+def barrido(path=CSV_PATH, q_valores=Q_VALORES, alfas=ALFAS):
+    """Devuelve un DataFrame con una fila por cada par (Q, alfa)."""
+    x_ordenado, acum, _ = preparar_orden(path)
+
+    filas = []
+    for q in q_valores:
+        O = tabla_q(x_ordenado, acum, q)
+        r, c = O.shape
+        E = O.sum(axis=1, keepdims=True) @ O.sum(axis=0, keepdims=True) / O.sum()
+        chi2_stat = ((O - E) ** 2 / E).sum()
+        gl = (r - 1) * (c - 1)
+        p_valor = chi2.sf(chi2_stat, gl)
+        for alfa in alfas:
+            chi2_crit = chi2.ppf(1 - alfa, gl)
+            filas.append({
+                "Q": q, "clases": r, "alfa": alfa,
+                "X2": chi2_stat, "gl": gl, "p_valor": p_valor,
+                "X2_critico": chi2_crit, "rechaza_H0": chi2_stat > chi2_crit,
+                "E_min": E.min(), "celdas_E_lt5": int((E < 5).sum()),
+            })
+    return pd.DataFrame(filas)
+
+
+def main():
+    q_valores = list(Q_VALORES)
+    res = cache.memoizar(
+        "barrido_homogeneidad", CSV_PATH,
+        {"q_valores": q_valores, "alfas": list(ALFAS)},
+        barrido, CSV_PATH, q_valores, ALFAS,
+    )
+
+    print("=== Barrido de la dócima de homogeneidad (Q clases-cuantil x alfa) ===")
+    print(res.round(4).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
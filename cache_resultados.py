@@ -0,0 +1,209 @@
+"""
+Caché en disco de resultados, direccionado por contenido.
+
+Cada resultado se guarda bajo una clave que combina:
+    - el nombre del análisis ("homogeneidad", "intervalos", ...)
+    - la huella (hash BLAKE2b) del contenido del CSV de entrada
+    - los parámetros del análisis (Q_CLASES, ALFA, P0, nivel de confianza...)
+    - la huella del código: hash del fuente del módulo donde está definida
+      la función que calcula el resultado
+
+Si el CSV cambia, cambia su huella y la clave ya no coincide: el resultado
+viejo simplemente deja de usarse (y termina desalojado). Para no releer el
+archivo entero en cada corrida, la huella se recuerda junto con el tamaño
+y la fecha de modificación del archivo; solo se recalcula si alguno cambió.
+Del mismo modo, si se edita el script que calcula el resultado (por
+ejemplo calcular_homogeneidad en test_homogeneidad.py) cambia la huella
+del código y se vuelve a calcular. Los cambios en otros módulos que esa
+función usa no se detectan: en ese caso, borrar la caché con limpiar().
+
+Los resultados se guardan con pickle comprimido con zlib, un archivo por
+clave en CACHE_DIR. Desalojo:
+    - TTL: entradas sin usar hace más de TTL_SEGUNDOS se borran.
+    - LRU por tamaño: si el total supera MAX_BYTES se borran las entradas
+      usadas hace más tiempo (cada lectura actualiza la fecha del archivo).
+
+Uso:
+    import cache_resultados as cache
+    res = cache.memoizar("homogeneidad", CSV_PATH, {"q": Q_CLASES, "alfa": ALFA},
+                         calcular_homogeneidad, CSV_PATH, Q_CLASES, ALFA)
+
+Para desactivarlo, definir la variable de entorno TIF_SIN_CACHE=1.
+"""
+
+import hashlib
+import inspect
+import json
+import os
+import pickle
+import time
+import zlib
+
+CACHE_DIR = ".cache_resultados"
+MAX_BYTES = 512 * 1024**2          # 512 MB
+TTL_SEGUNDOS = 30 * 24 * 3600      # 30 días
+EXTENSION = ".pkz"
+INDICE_HUELLAS = "huellas.json"
+BLOQUE_HASH = 1024**2              # se hashea de a 1 MB
+
+
+# --------------------------------------------------------------
+# HUELLA DEL ARCHIVO DE ENTRADA
+# --------------------------------------------------------------
+
+def _leer_indice(cache_dir):
+    ruta = os.path.join(cache_dir, INDICE_HUELLAS)
+    try:
+        with open(ruta, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _guardar_indice(cache_dir, indice):
+    ruta = os.path.join(cache_dir, INDICE_HUELLAS)
+    tmp = ruta + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(indice, f)
+    os.replace(tmp, ruta)
+
+
+def huella_archivo(path, cache_dir=CACHE_DIR):
+    """
+    Hash del contenido de path. Se reutiliza el hash guardado si el tamaño
+    y la fecha de modificación (en ns) no cambiaron.
+    """
+    st = os.stat(path)
+    clave = os.path.abspath(path)
+    firma = [st.st_size, st.st_mtime_ns]
+
+    indice = _leer_indice(cache_dir)
+    guardado = indice.get(clave)
+    if guardado is not None and guardado["firma"] == firma:
+        return guardado["hash"]
+
+    h = hashlib.blake2b(digest_size=20)
+    with open(path, "rb") as f:
+        for bloque in iter(lambda: f.read(BLOQUE_HASH), b""):
+            h.update(bloque)
+    huella = h.hexdigest()
+
+    os.makedirs(cache_dir, exist_ok=True)
+    indice[clave] = {"firma": firma, "hash": huella}
+    _guardar_indice(cache_dir, indice)
+    return huella
+
+
+def huella_codigo(funcion):
+    """
+    Hash del código fuente del módulo que define `funcion` (si no se puede
+    leer, el de la función sola; si tampoco, su nombre calificado).
+    """
+    try:
+        fuente = inspect.getsource(inspect.getmodule(funcion) or funcion)
+    except (OSError, TypeError):
+        try:
+            fuente = inspect.getsource(funcion)
+        except (OSError, TypeError):
+            fuente = getattr(funcion, "__qualname__", repr(funcion))
+    return hashlib.blake2b(fuente.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def clave_resultado(nombre, path, parametros, cache_dir=CACHE_DIR, codigo=None):
+    """Clave del resultado: hash de (nombre, huella del CSV, parámetros, huella del código)."""
+    contenido = json.dumps(
+        {"nombre": nombre, "datos": huella_archivo(path, cache_dir), "parametros": parametros,
+         "codigo": codigo},
+        sort_keys=True, default=str,
+    )
+    return hashlib.blake2b(contenido.encode("utf-8"), digest_size=20).hexdigest()
+
+
+# --------------------------------------------------------------
+# LECTURA / ESCRITURA / DESALOJO
+# --------------------------------------------------------------
+
+def _ruta(cache_dir, clave):
+    return os.path.join(cache_dir, clave + EXTENSION)
+
+
+def leer(clave, cache_dir=CACHE_DIR, ttl=TTL_SEGUNDOS):
+    """Devuelve (True, resultado) si la clave está y no venció; si no, (False, None)."""
+    ruta = _ruta(cache_dir, clave)
+    try:
+        st = os.stat(ruta)
+        if ttl is not None and time.time() - st.st_mtime > ttl:
+            os.remove(ruta)
+            return False, None
+        with open(ruta, "rb") as f:
+            resultado = pickle.loads(zlib.decompress(f.read()))
+    except (OSError, zlib.error, pickle.UnpicklingError, EOFError,
+            AttributeError, ImportError, IndexError, TypeError, ValueError):
+        # archivo dañado o de una versión del código que ya no se puede
+        # deserializar (ModuleNotFoundError es un ImportError): se recalcula
+        return False, None
+    os.utime(ruta)   # marca de último uso para el LRU
+    return True, resultado
+
+
+def guardar(clave, resultado, cache_dir=CACHE_DIR, max_bytes=MAX_BYTES, ttl=TTL_SEGUNDOS):
+    """Guarda el resultado y aplica el desalojo por TTL y tamaño."""
+    os.makedirs(cache_dir, exist_ok=True)
+    datos = zlib.compress(pickle.dumps(resultado, protocol=pickle.HIGHEST_PROTOCOL))
+    ruta = _ruta(cache_dir, clave)
+    tmp = ruta + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(datos)
+    os.replace(tmp, ruta)
+    desalojar(cache_dir, max_bytes, ttl)
+
+
+def desalojar(cache_dir=CACHE_DIR, max_bytes=MAX_BYTES, ttl=TTL_SEGUNDOS):
+    """Borra las entradas vencidas y, si hace falta, las menos usadas."""
+    ahora = time.time()
+    entradas = []
+    for nombre in os.listdir(cache_dir):
+        if not nombre.endswith(EXTENSION):
+            continue
+        ruta = os.path.join(cache_dir, nombre)
+        try:
+            st = os.stat(ruta)
+        except OSError:
+            continue
+        if ttl is not None and ahora - st.st_mtime > ttl:
+            os.remove(ruta)
+        else:
+            entradas.append((st.st_mtime, st.st_size, ruta))
+
+    total = sum(tam for _, tam, _ in entradas)
+    for _, tam, ruta in sorted(entradas):
+        if total <= max_bytes:
+            break
+        os.remove(ruta)
+        total -= tam
+
+
+def limpiar(cache_dir=CACHE_DIR):
+    """Vacía la caché por completo."""
+    if not os.path.isdir(cache_dir):
+        return
+    for nombre in os.listdir(cache_dir):
+        os.remove(os.path.join(cache_dir, nombre))
+
+
+def memoizar(nombre, path, parametros, funcion, *args, cache_dir=CACHE_DIR, **kwargs):
+    """
+    Devuelve funcion(*args, **kwargs), tomándolo de la caché si ya se
+    calculó para el mismo contenido de path y los mismos parámetros.
+    """
+    if os.environ.get("TIF_SIN_CACHE"):
+        return funcion(*args, **kwargs)
+
+    clave = clave_resultado(nombre, path, parametros, cache_dir, huella_codigo(funcion))
+    encontrado, resultado = leer(clave, cache_dir)
+    if encontrado:
+        return resultado
+
+    resultado = funcion(*args, **kwargs)
+    guardar(clave, resultado, cache_dir)
+    return resultado
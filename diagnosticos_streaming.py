@@ -0,0 +1,405 @@
+"""
+Diagnóstico de los supuestos de la regresión en UNA sola pasada
+sobre los residuos, leídos por bloques (memoria constante).
+
+regresion.py usa shapiro (válido hasta ~5000 puntos), het_breuschpagan y
+durbin_watson sobre el vector completo de residuos. Acá cada supuesto se
+resume en sumas que se actualizan bloque a bloque:
+
+1) Normalidad
+   - Jarque-Bera:  JB = n/6 * (g1^2 + g2^2/4)
+     con g1 y g2 obtenidos de los momentos centrales m2, m3, m4, que se
+     combinan entre bloques con las fórmulas de Chan / Pébay.
+   - Anderson-Darling: los residuos se cuentan en un histograma fino
+     (N_BINS clases alrededor de 0); los pocos valores que caen fuera del
+     rango se guardan exactos, hasta MAX_COLAS. Si se juntan más (primer
+     bloque poco representativo, datos ordenados o con deriva) el rango
+     del histograma se duplica uniendo clases de a pares, así la memoria
+     no crece con n. A^2 se evalúa en su forma integral
+         A^2 = n ∫ (F_n - F)^2 / (F (1 - F)) dF
+     con la media y el desvío finales. Dentro de cada clase los valores se
+     suponen repartidos de forma uniforme: en las clases con pocos valores
+     (y en las colas exactas) F_n es la escalera y la integral es cerrada;
+     en las clases con muchos, F_n es lineal (cuadratura de Gauss-Legendre)
+     más el término del diente de sierra, 1/(12 n^2) por unidad de peso.
+     Así el error de discretizar no crece con n (poner todos los valores
+     en el punto medio de la clase sí: rechazaba normalidad en datos
+     normales a partir de n ~ 10^7). p-valor de D'Agostino-Stephens
+     (parámetros estimados).
+
+2) Homocedasticidad – Breusch-Pagan (versión de Koenker, la que usa
+   statsmodels por defecto): regresión auxiliar de u = e^2 sobre Z.
+   Se acumulan Z'Z, Z'u, u'u y Σu, y LM = n * R^2_aux ~ chi2(k - 1).
+
+3) Independencia – Durbin-Watson:
+       DW = Σ (e_t - e_{t-1})^2 / Σ e_t^2
+   Se guarda el último residuo de cada bloque para enlazar con el siguiente,
+   por eso los bloques tienen que llegar en orden.
+
+Uso típico (ver main): ajustar el modelo con regresion_multiple.py y pasar
+los residuos de cada bloque a actualizar_diagnostico().
+"""
+
+import math
+
+import numpy as np
+from scipy.stats import chi2, norm
+
+import overlays
+import regresion_multiple as rm
+
+CSV_PATH = rm.CSV_PATH
+ESCENARIO = rm.ESCENARIO
+CHUNK_SIZE = 200_000
+N_BINS = 8192         # clases del histograma para Anderson-Darling (múltiplo de 4)
+RANGO_BINS = 8.0      # el histograma cubre ± RANGO_BINS desvíos del primer bloque
+MAX_COLAS = 10_000    # valores fuera del histograma que se guardan exactos
+MAX_ESCALONES = 64    # clases con hasta estos valores se integran como escalera
+N_NODOS = 8           # nodos de Gauss-Legendre por clase
+ALFA = 0.05
+
+
+# --------------------------------------------------------------
+# ESTADO ACUMULADO
+# --------------------------------------------------------------
+
+def nuevo_diagnostico(k):
+    """
+    Estado vacío para k regresores en Z (incluyendo la constante).
+    """
+    return {
+        # momentos centrales (n, media, M2, M3, M4) con M_k = Σ (e - media)^k
+        "n": 0, "media": 0.0, "M2": 0.0, "M3": 0.0, "M4": 0.0,
+        # histograma para Anderson-Darling (se define con el primer bloque)
+        "bordes": None, "conteos": None, "colas": [],
+        # regresión auxiliar de Breusch-Pagan
+        "ZtZ": np.zeros((k, k)), "Ztu": np.zeros(k), "utu": 0.0, "sum_u": 0.0,
+        # Durbin-Watson
+        "sum_dif2": 0.0, "ultimo": None,
+    }
+
+
+def _combinar_momentos(est, e):
+    """Agrega los momentos centrales del bloque e al estado (Pébay, 2008)."""
+    nb = len(e)
+    mb = e.mean()
+    d = e - mb
+    M2b, M3b, M4b = (d**2).sum(), (d**3).sum(), (d**4).sum()
+
+    na = est["n"]
+    n = na + nb
+    delta = mb - est["media"]
+    M2a, M3a, M4a = est["M2"], est["M3"], est["M4"]
+
+    est["M4"] = (M4a + M4b
+                 + delta**4 * na * nb * (na**2 - na * nb + nb**2) / n**3
+                 + 6 * delta**2 * (na**2 * M2b + nb**2 * M2a) / n**2
+                 + 4 * delta * (na * M3b - nb * M3a) / n)
+    est["M3"] = (M3a + M3b
+                 + delta**3 * na * nb * (na - nb) / n**2
+                 + 3 * delta * (na * M2b - nb * M2a) / n)
+    est["M2"] = M2a + M2b + delta**2 * na * nb / n
+    est["media"] += delta * nb / n
+    est["n"] = n
+
+
+def _actualizar_histograma(est, e):
+    if est["bordes"] is None:
+        escala = e.std() if len(e) > 1 and e.std() > 0 else 1.0
+        centro = e.mean()
+        est["bordes"] = np.linspace(centro - RANGO_BINS * escala,
+                                    centro + RANGO_BINS * escala, N_BINS + 1)
+        est["conteos"] = np.zeros(N_BINS, dtype=np.int64)
+
+    bordes = est["bordes"]
+    dentro = (e >= bordes[0]) & (e < bordes[-1])
+    est["conteos"] += np.histogram(e[dentro], bins=bordes)[0]
+    if not dentro.all():
+        est["colas"].extend(e[~dentro].tolist())
+        if len(est["colas"]) > MAX_COLAS:
+            _ensanchar_histograma(est)
+
+
+def _ensanchar_histograma(est):
+    """
+    Duplica el rango del histograma (mismo centro, clases unidas de a pares)
+    hasta que queden fuera a lo sumo MAX_COLAS / 2 valores, y pasa al
+    histograma los valores de las colas que ahora entran.
+    """
+    colas = np.asarray(est["colas"], dtype=float)
+    bordes, conteos = est["bordes"], est["conteos"]
+    fuera = (colas < bordes[0]) | (colas >= bordes[-1])
+    while fuera.sum() > MAX_COLAS // 2:
+        centro = (bordes[0] + bordes[-1]) / 2
+        semiancho = bordes[-1] - bordes[0]          # el doble del anterior
+        bordes = np.linspace(centro - semiancho, centro + semiancho, N_BINS + 1)
+        nuevos = np.zeros(N_BINS, dtype=np.int64)
+        # las clases viejas ocupan la mitad central, de a dos por clase nueva
+        nuevos[N_BINS // 4: 3 * N_BINS // 4] = conteos.reshape(-1, 2).sum(axis=1)
+        conteos = nuevos
+        fuera = (colas < bordes[0]) | (colas >= bordes[-1])
+
+    conteos += np.histogram(colas[~fuera], bins=bordes)[0]
+    est["bordes"], est["conteos"] = bordes, conteos
+    est["colas"] = colas[fuera].tolist()
+
+
+def actualizar_diagnostico(est, e, Z):
+    """
+    Incorpora un bloque de residuos e (largo m) y su matriz Z (m x k).
+    """
+    e = np.asarray(e, dtype=float)
+    if len(e) == 0:
+        return est
+
+    _combinar_momentos(est, e)
+    _actualizar_histograma(est, e)
+
+    u = e**2
+    est["ZtZ"] += Z.T @ Z
+    est["Ztu"] += Z.T @ u
+    est["utu"] += float(u @ u)
+    est["sum_u"] += float(u.sum())
+
+    if est["ultimo"] is not None:
+        est["sum_dif2"] += (e[0] - est["ultimo"])**2
+    est["sum_dif2"] += float((np.diff(e)**2).sum())
+    est["ultimo"] = e[-1]
+    return est
+
+
+# --------------------------------------------------------------
+# ESTADÍSTICOS FINALES
+# --------------------------------------------------------------
+
+def _p_valor_anderson(A2, n):
+    """p-valor de A^2 para normal con media y varianza estimadas (D'Agostino-Stephens)."""
+    A = A2 * (1 + 0.75 / n + 2.25 / n**2)
+    if A >= 153:
+        # el exponente de la fórmula tiene su mínimo en A ≈ 153.5 y después
+        # vuelve a crecer (y desborda): ahí el p-valor ya es ~1e-190
+        return 0.0
+    if A >= 0.6:
+        p = math.exp(1.2937 - 5.709 * A + 0.0186 * A**2)
+    elif A >= 0.34:
+        p = math.exp(0.9177 - 4.279 * A - 1.38 * A**2)
+    elif A >= 0.2:
+        p = 1 - math.exp(-8.318 + 42.796 * A - 59.938 * A**2)
+    else:
+        p = 1 - math.exp(-13.436 + 101.14 * A - 223.73 * A**2)
+    return min(max(p, 0.0), 1.0)
+
+
+def _integral_escalera(z1, z2, k, n):
+    """
+    ∫ (c - F)^2 / (F (1 - F)) dF entre z1 y z2 (en desvíos), con F_n = c = k/n
+    constante:  -(F2 - F1) + c^2 ln(F2/F1) - (1 - c)^2 ln((1 - F2)/(1 - F1)).
+    """
+    c = k / n
+    cc = (n - k) / n
+    # F2 - F1 restando en la cola donde no se pierden dígitos
+    dF = np.where(z1 >= 0, norm.sf(z1) - norm.sf(z2), norm.cdf(z2) - norm.cdf(z1))
+    with np.errstate(invalid="ignore"):
+        t1 = np.where(k > 0, c**2 * (norm.logcdf(z2) - norm.logcdf(z1)), 0.0)
+        t2 = np.where(k < n, cc**2 * (norm.logsf(z2) - norm.logsf(z1)), 0.0)
+    return float((-dF + t1 - t2).sum())
+
+
+def _integral_lineal(za, zb, Ka, c, n):
+    """
+    ∫ (F_n - F)^2 / (F (1 - F)) dF sobre clases [za, zb] donde F_n sube
+    linealmente de Ka/n a (Ka + c)/n, más el diente de sierra de los c
+    escalones: (1 / (12 n^2)) ∫ dF / (F (1 - F)).
+    """
+    t, w = np.polynomial.legendre.leggauss(N_NODOS)
+    medio = ((za + zb) / 2)[:, None]
+    semi = ((zb - za) / 2)[:, None]
+    z = medio + semi * t
+    frac = (t + 1) / 2
+    k = Ka[:, None] + c[:, None] * frac         # n F_n en cada nodo
+    # F_n - F, usando 1 - F_n y 1 - F en la mitad superior
+    D = np.where(z < 0, k / n - norm.cdf(z), (n - k) / n - norm.sf(z))
+    peso = np.exp(norm.logpdf(z) - norm.logcdf(z) - norm.logsf(z))
+    diente = 1.0 / (12.0 * n**2)
+    return float(((D**2 + diente) * peso * w * semi).sum())
+
+
+def _anderson_darling(est, media, desvio):
+    """
+    A^2 = n ∫ (F_n - F)^2 / (F (1 - F)) dF a partir del histograma y las
+    colas exactas, con los valores de cada clase repartidos uniformemente.
+    """
+    bordes = (est["bordes"] - media) / desvio
+    conteos = est["conteos"]
+    colas = np.sort((np.asarray(est["colas"], dtype=float) - media) / desvio)
+    izq = colas[colas < bordes[0]]
+    der = colas[colas >= bordes[-1]]
+    n = int(conteos.sum()) + len(colas)
+    K = len(izq) + np.concatenate([[0], np.cumsum(conteos)])   # n F_n en cada borde
+
+    # escaleras: cola izquierda, clases con pocos valores y cola derecha
+    z1 = [np.concatenate([[-np.inf], izq])]
+    z2 = [np.concatenate([izq, [bordes[0]]])]
+    ks = [np.arange(len(izq) + 1)]
+
+    chicas = np.flatnonzero(conteos <= MAX_ESCALONES)
+    c = conteos[chicas]
+    tramos = c + 1                                   # c valores -> c + 1 tramos
+    clase = np.repeat(chicas, tramos)
+    j = np.arange(tramos.sum()) - np.repeat(np.cumsum(tramos) - tramos, tramos)
+    cj = np.repeat(np.maximum(c, 1), tramos)
+    a, ancho = bordes[clase], bordes[clase + 1] - bordes[clase]
+    z1.append(np.where(j == 0, a, a + (j - 0.5) / cj * ancho))
+    z2.append(np.where(j == np.repeat(c, tramos), bordes[clase + 1], a + (j + 0.5) / cj * ancho))
+    ks.append(K[clase] + j)
+
+    z1.append(np.concatenate([[bordes[-1]], der]))
+    z2.append(np.concatenate([der, [np.inf]]))
+    ks.append(n - len(der) + np.arange(len(der) + 1))
+
+    total = _integral_escalera(np.concatenate(z1), np.concatenate(z2),
+                               np.concatenate(ks).astype(float), n)
+
+    grandes = np.flatnonzero(conteos > MAX_ESCALONES)
+    if len(grandes):
+        total += _integral_lineal(bordes[grandes], bordes[grandes + 1],
+                                  K[grandes].astype(float), conteos[grandes].astype(float), n)
+    return n * total
+
+
+def resultados_diagnostico(est):
+    """Devuelve un dict con JB, AD, BP y DW (y sus p-valores)."""
+    n = est["n"]
+    m2 = est["M2"] / n
+    m3 = est["M3"] / n
+    m4 = est["M4"] / n
+    g1 = m3 / m2**1.5
+    g2 = m4 / m2**2 - 3
+    jb = n / 6 * (g1**2 + g2**2 / 4)
+
+    desvio = math.sqrt(est["M2"] / (n - 1))
+    A2 = _anderson_darling(est, est["media"], desvio)
+
+    ZtZ, Ztu = est["ZtZ"], est["Ztu"]
+    gamma = np.linalg.lstsq(ZtZ, Ztu, rcond=None)[0]
+    SCE_aux = est["utu"] - gamma @ Ztu
+    SCT_aux = est["utu"] - est["sum_u"]**2 / n
+    R2_aux = 1 - SCE_aux / SCT_aux
+    gl_bp = np.linalg.matrix_rank(ZtZ) - 1
+    bp = n * R2_aux
+
+    dw = est["sum_dif2"] / (est["M2"] + n * est["media"]**2)   # Σ e^2
+
+    return {
+        "n": n, "asimetria": g1, "curtosis": g2,
+        "JB": jb, "p_JB": chi2.sf(jb, 2),
+        "AD": A2, "p_AD": _p_valor_anderson(A2, n),
+        "BP": bp, "gl_BP": gl_bp, "p_BP": chi2.sf(bp, gl_bp),
+        "DW": dw,
+    }
+
+
+def diagnosticar_csv(path=CSV_PATH, chunksize=CHUNK_SIZE, escenario=ESCENARIO):
+    """
+    Ajusta el modelo de regresion_multiple.py y recorre el CSV una vez más
+    calculando residuos y diagnósticos bloque a bloque.
+    """
+    niveles, media_x = rm.explorar_csv(path, chunksize, escenario)
+    res = rm.resolver_ols(*rm.acumular_sumas(path, niveles, media_x, chunksize,
+                                             escenario=escenario))
+    beta = res["beta"]
+
+    est = nuevo_diagnostico(len(beta))
+    columnas = rm.CATEGORICAS + [rm.NUMERICA, rm.RESPUESTA]
+    for chunk in overlays.leer_csv(path, escenario, usecols=columnas, chunksize=chunksize):
+        chunk = chunk.dropna(subset=columnas)
+        X = rm.armar_X(chunk, niveles, media_x)
+        e = chunk[rm.RESPUESTA].astype(float).values - X @ beta
+        actualizar_diagnostico(est, e, X)
+    return resultados_diagnostico(est)
+
+
+# --------------------------------------------------------------
+# VERIFICACIÓN
+# --------------------------------------------------------------
+
+def _a2_exacto(e):
+    """A^2 directo sobre todos los valores ordenados (solo para verificar)."""
+    e = np.sort(e)
+    n = len(e)
+    z = (e - e.mean()) / e.std(ddof=1)
+    i = np.arange(1, n + 1)
+    return -n - np.sum((2 * i - 1) * (norm.logcdf(z) + norm.logsf(z[::-1]))) / n
+
+
+def verificar_no_normales(semilla=2025, tolerancia=0.01):
+    """
+    Chequeo con flujos de residuos grandes, por bloques:
+      - no normales: t de Student (5 gl, n = 200.000), exponencial centrada
+        (n = 10.000) y la misma t ordenada por |e| (el primer bloque no
+        representa al resto). Se tiene que rechazar normalidad.
+      - normales: N(0, 1) con n = 10^7 (bloques de 10^6) y n = 10^6
+        ordenada por |e|. Anderson-Darling NO tiene que rechazar.
+    En todos los casos: sin desbordes, a lo sumo MAX_COLAS valores exactos
+    y A^2 a menos de `tolerancia` del calculado con todos los valores.
+    Devuelve {caso: resultados}.
+    """
+    rng = np.random.default_rng(semilla)
+    t5 = rng.standard_t(5, 200_000)
+    normal = rng.standard_normal(1_000_000)
+    casos = {
+        # caso: (residuos, tamaño de bloque, ¿es normal?)
+        "t5": (t5, 10_000, False),
+        "exponencial": (rng.exponential(1.0, 10_000) - 1.0, 1_000, False),
+        "t5_ordenada": (t5[np.argsort(np.abs(t5))], 10_000, False),     # de menor a mayor |e|
+        "normal_1e7": (rng.standard_normal(10_000_000), 1_000_000, True),
+        "normal_ordenada": (normal[np.argsort(np.abs(normal))], 10_000, True),
+    }
+
+    salida = {}
+    for caso, (e, chunksize, es_normal) in casos.items():
+        est = nuevo_diagnostico(1)
+        for i in range(0, len(e), chunksize):
+            bloque = e[i:i + chunksize]
+            actualizar_diagnostico(est, bloque, np.ones((len(bloque), 1)))
+            if len(est["colas"]) > MAX_COLAS:
+                raise AssertionError(f"{caso}: {len(est['colas'])} valores exactos en las colas")
+        d = resultados_diagnostico(est)
+
+        exacto = _a2_exacto(e)
+        if abs(d["AD"] - exacto) > tolerancia * max(1.0, exacto):
+            raise AssertionError(f"{caso}: A² = {d['AD']} por bloques y {exacto} exacto")
+        if es_normal and d["p_AD"] < ALFA:
+            raise AssertionError(f"{caso}: se rechaza normalidad en datos normales (p_AD = {d['p_AD']})")
+        if not es_normal and not (d["p_AD"] < ALFA and d["p_JB"] < ALFA):
+            raise AssertionError(f"{caso}: no se rechaza normalidad (p_AD = {d['p_AD']}, p_JB = {d['p_JB']})")
+        salida[caso] = d
+    return salida
+
+
+def main():
+    d = diagnosticar_csv()
+
+    print("=== DIAGNÓSTICO DE SUPUESTOS (una pasada, por bloques) ===")
+    print(f"n = {d['n']}\n")
+
+    print("=== SUPUESTO 2: Normalidad ===")
+    print(f"g1 (asimetría)      = {d['asimetria']:.4f}")
+    print(f"g2 (exceso curtosis)= {d['curtosis']:.4f}")
+    print(f"Jarque-Bera         = {d['JB']:.4f},  p-value = {d['p_JB']:.4f}")
+    print(f"Anderson-Darling A² = {d['AD']:.4f},  p-value = {d['p_AD']:.4f}")
+
+    print("\n=== SUPUESTO 3: Homocedasticidad (Breusch-Pagan) ===")
+    print(f"BP statistic = {d['BP']:.4f},  gl = {d['gl_BP']},  p-value = {d['p_BP']:.4f}")
+
+    print("\n=== SUPUESTO 4: Independencia (Durbin-Watson) ===")
+    print(f"Durbin-Watson = {d['DW']:.4f}")
+    print("  (valores cercanos a 2 indican residuos no autocorrelacionados)")
+
+    print(f"\nCon alfa = {ALFA:.2f}:")
+    print("  Normalidad       :", "se rechaza" if min(d["p_JB"], d["p_AD"]) < ALFA else "no se rechaza")
+    print("  Homocedasticidad :", "se rechaza" if d["p_BP"] < ALFA else "no se rechaza")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Gráficos que no crecen con n.
+
+Con pocos datos (n <= UMBRAL_PUNTOS) cada función dibuja exactamente lo
+mismo que antes (plt.scatter, plt.hist, stats.probplot, plt.plot con
+marcadores). Con más datos pasa a una representación agregada, cuyo costo
+de dibujo y tamaño de archivo dependen de la resolución y no de n:
+
+    - dispersion / residuos_vs_ajustados -> hexbin (densidad, escala log)
+    - histograma                         -> np.histogram + stairs
+    - qq_normal                          -> N_CUANTILES cuantiles muestrales
+    - serie_residuos                     -> banda min-max + media por ventana
+
+Todas dibujan sobre el eje actual (o el que se pase en ax), así que se
+usan igual que las funciones de matplotlib: plt.figure(), función, plt.show().
+"""
+
+import numpy as np
+import matplotlib.pyplot as plt
+import scipy.stats as stats
+
+UMBRAL_PUNTOS = 50_000   # a partir de acá se agregan los datos
+GRIDSIZE = 80            # hexágonos por eje en hexbin
+N_CUANTILES = 1000       # puntos del QQ-plot agregado
+N_VENTANAS = 1000        # ventanas de la serie de residuos agregada
+
+
+def _es_grande(n, umbral):
+    return umbral is not None and n > umbral
+
+
+def dispersion(x, y, ax=None, umbral=UMBRAL_PUNTOS, gridsize=GRIDSIZE, **kwargs):
+    """
+    Diagrama de dispersión. Si hay más de `umbral` puntos dibuja la
+    densidad con hexbin (y una barra de colores con el conteo).
+    """
+    ax = ax or plt.gca()
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+
+    if not _es_grande(len(x), umbral):
+        return ax.scatter(x, y, **kwargs)
+
+    label = kwargs.get("label")
+    hb = ax.hexbin(x, y, gridsize=gridsize, bins="log", mincnt=1,
+                   cmap="viridis", label=label)
+    plt.colorbar(hb, ax=ax, label="Cantidad de puntos (log)")
+    return hb
+
+
+def residuos_vs_ajustados(ajustados, residuos, ax=None, umbral=UMBRAL_PUNTOS, **kwargs):
+    """Residuos vs valores ajustados con la línea en 0."""
+    ax = ax or plt.gca()
+    artista = dispersion(ajustados, residuos, ax=ax, umbral=umbral, **kwargs)
+    ax.axhline(0, color="black")
+    return artista
+
+
+def histograma(valores, bins=10, ax=None, umbral=UMBRAL_PUNTOS, **kwargs):
+    """
+    Histograma. Con muchos datos se cuentan las clases con np.histogram y
+    se dibuja solo el contorno de las clases.
+    También acepta una tupla (conteos, bordes) ya calculada, por ejemplo
+    acumulada por bloques.
+    """
+    ax = ax or plt.gca()
+    if isinstance(valores, tuple):
+        conteos, bordes = valores
+    else:
+        valores = np.asarray(valores, dtype=float)
+        if not _es_grande(len(valores), umbral):
+            return ax.hist(valores, bins=bins, **kwargs)
+        conteos, bordes = np.histogram(valores, bins=bins)
+
+    kwargs.setdefault("edgecolor", "black")
+    return ax.stairs(conteos, bordes, fill=True, **kwargs)
+
+
+def qq_normal(valores, ax=None, umbral=UMBRAL_PUNTOS, n_cuantiles=N_CUANTILES):
+    """
+    QQ-plot contra la Normal. Con muchos datos se grafican n_cuantiles
+    cuantiles muestrales en las posiciones (i - 0.5) / n_cuantiles en lugar
+    de los n puntos, con la misma recta de referencia que stats.probplot.
+    """
+    ax = ax or plt.gca()
+    valores = np.asarray(valores, dtype=float)
+
+    if not _es_grande(len(valores), umbral):
+        return stats.probplot(valores, dist="norm", plot=ax)
+
+    p = (np.arange(1, n_cuantiles + 1) - 0.5) / n_cuantiles
+    teoricos = stats.norm.ppf(p)
+    muestrales = np.quantile(valores, p)
+    pendiente, ordenada, r, _, _ = stats.linregress(teoricos, muestrales)
+
+    ax.plot(teoricos, muestrales, "o", markersize=3)
+    ax.plot(teoricos, ordenada + pendiente * teoricos, "r-")
+    ax.set_title("Probability Plot")
+    ax.set_xlabel("Theoretical quantiles")
+    ax.set_ylabel("Ordered Values")
+    return (teoricos, muestrales), (pendiente, ordenada, r)
+
+
+def serie_residuos(residuos, ax=None, umbral=UMBRAL_PUNTOS, n_ventanas=N_VENTANAS):
+    """
+    Residuos en el orden de las observaciones. Con muchos datos se parte la
+    serie en n_ventanas tramos y se dibuja el rango (min-max) y la media de
+    cada tramo.
+    """
+    ax = ax or plt.gca()
+    residuos = np.asarray(residuos, dtype=float)
+    n = len(residuos)
+
+    if not _es_grande(n, umbral):
+        lineas = ax.plot(residuos, marker="o")
+        ax.axhline(0, color="black")
+        return lineas
+
+    n_ventanas = min(n_ventanas, n)
+    cortes = np.linspace(0, n, n_ventanas + 1).astype(int)
+    inicio = cortes[:-1]
+    minimos = np.minimum.reduceat(residuos, inicio)
+    maximos = np.maximum.reduceat(residuos, inicio)
+    medias = np.add.reduceat(residuos, inicio) / np.diff(cortes)
+    centros = (cortes[:-1] + cortes[1:]) / 2
+
+    ax.fill_between(centros, minimos, maximos, alpha=0.3, step="mid", label="mín-máx")
+    lineas = ax.plot(centros, medias, label="media por tramo")
+    ax.axhline(0, color="black")
+    return lineas
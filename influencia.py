@@ -0,0 +1,125 @@
+"""
+Diagnóstico de influencia para la recta de regresión (peso_g ~ diametro_mm).
+
+Sin reajustar el modelo n veces: en la regresión simple todo sale de
+Sxx, x̄, los coeficientes y s^2 ya calculados en recta_regresion_lineal.py.
+Con p = 2 parámetros y e_i = y_i - ŷ_i:
+
+    Leverage:                 h_i = 1/n + (x_i - x̄)^2 / Sxx
+    Varianza sin la obs. i:   s_(i)^2 = [(n - p) s^2 - e_i^2 / (1 - h_i)] / (n - p - 1)
+    Residuo estudentizado
+    eliminado:                t_i = e_i / (s_(i) sqrt(1 - h_i))
+    Distancia de Cook:        D_i = e_i^2 h_i / (p s^2 (1 - h_i)^2)
+    DFFITS:                   t_i sqrt(h_i / (1 - h_i))
+    DFBETAS:                  Δb_j / (s_(i) sqrt(c_jj)), con
+        Δb1 = (x_i - x̄)/Sxx * e_i/(1 - h_i)
+        Δb0 = (1/n - x̄ (x_i - x̄)/Sxx) * e_i/(1 - h_i)
+        c_00 = 1/n + x̄^2/Sxx,   c_11 = 1/Sxx
+
+Todo es vectorizado y O(n). Se marca como influyente una observación que
+supera alguno de los umbrales habituales:
+    h_i > 2p/n,  |t_i| > 2,  D_i > 4/n,  |DFFITS| > 2 sqrt(p/n),  |DFBETAS| > 2/sqrt(n)
+
+Salida: tabla de los TOP_N tomates más influyentes (por distancia de Cook),
+identificados por id_tomate.
+"""
+
+import math
+
+import numpy as np
+import pandas as pd
+
+import overlays
+from recta_regresion_lineal import CSV_PATH, ESCENARIO, recta_cacheada
+
+TOP_N = 10
+P = 2   # parámetros del modelo (beta0, beta1)
+
+
+def medidas_influencia(x, y, recta):
+    """
+    Calcula las medidas de influencia para cada observación.
+    `recta` es el dict de calcular_recta() (n, x_bar, Sxx, beta0_hat, beta1_hat, s2).
+    Devuelve un DataFrame con una fila por observación.
+    """
+    n = recta["n"]
+    x_bar, Sxx, s2 = recta["x_bar"], recta["Sxx"], recta["s2"]
+
+    dx = x - x_bar
+    e = y - (recta["beta0_hat"] + recta["beta1_hat"] * x)
+    h = 1.0 / n + dx**2 / Sxx
+    uno_menos_h = 1.0 - h
+
+    s2_i = ((n - P) * s2 - e**2 / uno_menos_h) / (n - P - 1)
+    s_i = np.sqrt(np.clip(s2_i, 0.0, None))
+
+    t = e / (s_i * np.sqrt(uno_menos_h))
+    cook = e**2 * h / (P * s2 * uno_menos_h**2)
+    dffits = t * np.sqrt(h / uno_menos_h)
+
+    factor = e / uno_menos_h
+    dfbeta0 = (1.0 / n - x_bar * dx / Sxx) * factor
+    dfbeta1 = dx / Sxx * factor
+    dfbetas0 = dfbeta0 / (s_i * math.sqrt(1.0 / n + x_bar**2 / Sxx))
+    dfbetas1 = dfbeta1 / (s_i * math.sqrt(1.0 / Sxx))
+
+    return pd.DataFrame({
+        "residuo": e,
+        "leverage": h,
+        "t_estudentizado": t,
+        "cook": cook,
+        "dffits": dffits,
+        "dfbetas_b0": dfbetas0,
+        "dfbetas_b1": dfbetas1,
+    })
+
+
+def marcar_influyentes(medidas, n):
+    """Agrega una columna por criterio (True si supera el umbral) y el total."""
+    criterios = pd.DataFrame({
+        "h_alto": medidas["leverage"] > 2 * P / n,
+        "t_alto": medidas["t_estudentizado"].abs() > 2,
+        "cook_alto": medidas["cook"] > 4 / n,
+        "dffits_alto": medidas["dffits"].abs() > 2 * math.sqrt(P / n),
+        "dfbetas_alto": (medidas[["dfbetas_b0", "dfbetas_b1"]].abs() > 2 / math.sqrt(n)).any(axis=1),
+    })
+    medidas = medidas.join(criterios)
+    medidas["n_criterios"] = criterios.sum(axis=1)
+    return medidas
+
+
+def tabla_influencia(path=CSV_PATH, escenario=ESCENARIO, top_n=TOP_N):
+    """Devuelve (ranking de los top_n por Cook, cantidad de observaciones marcadas, n)."""
+    recta = recta_cacheada(path, escenario)
+
+    df = overlays.leer_csv(path, escenario, usecols=["id_tomate", "diametro_mm", "peso_g"])
+    x = df["diametro_mm"].astype(float).values
+    y = df["peso_g"].astype(float).values
+
+    medidas = marcar_influyentes(medidas_influencia(x, y, recta), recta["n"])
+    medidas.insert(0, "id_tomate", df["id_tomate"].values)
+    medidas.insert(1, "diametro_mm", x)
+    medidas.insert(2, "peso_g", y)
+
+    n_marcadas = int((medidas["n_criterios"] > 0).sum())
+    ranking = medidas.nlargest(top_n, "cook")
+    return ranking, n_marcadas, recta["n"]
+
+
+def main():
+    ranking, n_marcadas, n = tabla_influencia()
+
+    print("=== DIAGNÓSTICO DE INFLUENCIA (peso_g ~ diametro_mm) ===")
+    print(f"n = {n}")
+    print(f"Umbrales: h > {2 * P / n:.4f}, |t| > 2, D > {4 / n:.4f}, "
+          f"|DFFITS| > {2 * math.sqrt(P / n):.4f}, |DFBETAS| > {2 / math.sqrt(n):.4f}")
+    print(f"Observaciones que superan al menos un umbral: {n_marcadas}\n")
+
+    columnas = ["id_tomate", "diametro_mm", "peso_g", "residuo", "leverage",
+                "t_estudentizado", "cook", "dffits", "dfbetas_b0", "dfbetas_b1", "n_criterios"]
+    print(f"=== {len(ranking)} tomates más influyentes (por distancia de Cook) ===")
+    print(ranking[columnas].round(4).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
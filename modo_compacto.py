@@ -0,0 +1,223 @@
+"""
+Modo compacto de baja memoria (opcional).
+
+Con pd.read_csv, diametro_mm y peso_g quedan en float64 (8 bytes) y
+turno, lote_proveedor, categoria_calidad y defecto como strings de Python
+(un puntero de 8 bytes + ~50 bytes por objeto). En modo compacto:
+
+    - mediciones (diametro_mm, peso_g)       -> float32          (4 bytes)
+      (si tienen decimales fijos; si no, quedan en float64)
+    - categóricas (turno, lote, categoría...) -> category, códigos int8 (1 byte)
+    - id_tomate                              -> entero más chico posible
+    - defecto ("Sí"/"No")                    -> bits empaquetados (1/8 byte),
+                                                fuera del DataFrame
+
+El CSV se lee por bloques y cada bloque se compacta antes de leer el
+siguiente, así que nunca está la base completa en la versión grande.
+
+Precisión: las reducciones (sumas, medias, momentos) NO se hacen en
+float32. suma_por_bloques() pasa cada bloque a float64, suma con
+np.sum (suma por pares) y acumula los bloques con math.fsum (suma
+compensada exacta). Además, al leer se detecta cuántos decimales tiene
+cada medición en el CSV (diametro_mm = 1 decimal, por ejemplo); si el
+error de float32 es menor que medio decimal, al pasar a float64 se
+redondea y se recupera exactamente el mismo número que en el camino
+normal. Las columnas sin decimales fijos en el primer bloque (como el
+peso_g regenerado por ajustar_regresion.py) se dejan en float64, porque
+float32 no alcanza para reproducir sumas como Σy² con 4 decimales.
+
+Se activa con la variable de entorno TIF_MODO_COMPACTO=1 (los scripts
+recta_regresion_lineal.py, u8_intervalos.py, u6_simetria_curtosis.py y
+test_proporcion_productorA.py la respetan). Ejecutar este archivo muestra
+la memoria por fila de ambos modos.
+"""
+
+import math
+import os
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+import overlays
+
+ACTIVO = bool(os.environ.get("TIF_MODO_COMPACTO"))
+
+CSV_PATH = overlays.BASE_CSV
+CHUNK_SIZE = 500_000
+BLOQUE = 1_000_000            # elementos por bloque en las reducciones
+MAX_DECIMALES = 6
+
+MEDICIONES = ["diametro_mm", "peso_g"]
+ENTERAS = ["id_tomate"]
+BOOLEANA = "defecto"
+VALOR_VERDADERO = "Sí"
+
+
+# --------------------------------------------------------------
+# LECTURA
+# --------------------------------------------------------------
+
+def _decimales(v):
+    """Menor d tal que v redondeado a d decimales es v; None si d > MAX_DECIMALES."""
+    v = v[~np.isnan(v)]
+    for d in range(MAX_DECIMALES + 1):
+        if np.array_equal(np.round(v, d), v):
+            return d
+    return None
+
+
+def _float32_recuperable(d, maximo):
+    """True si el error de float32 (|x| * 2^-24) es menor que medio decimal."""
+    return d is not None and maximo * 2.0**-24 < 0.5 * 10.0**-d
+
+
+def _compactar(chunk, estado):
+    """
+    Pasa un bloque a tipos compactos; devuelve (bloque, bits de defecto o None).
+    En estado[col] acumula, por medición, los decimales, el máximo |x| y si
+    se guarda en float32 (se decide con el primer bloque).
+    """
+    bits = None
+    for col in list(chunk.columns):
+        if col in MEDICIONES:
+            v = chunk[col].values.astype(np.float64)
+            d = _decimales(v)
+            maximo = float(np.nanmax(np.abs(v))) if len(v) else 0.0
+            if col not in estado:
+                # una columna sin decimales fijos (p. ej. peso_g regenerado)
+                # no se puede pasar a float32 sin cambiar los resultados
+                estado[col] = {"d": d, "max": maximo,
+                               "float32": _float32_recuperable(d, maximo)}
+            else:
+                e = estado[col]
+                e["d"] = None if d is None or e["d"] is None else max(d, e["d"])
+                e["max"] = max(e["max"], maximo)
+            if estado[col]["float32"]:
+                chunk[col] = chunk[col].astype(np.float32)
+        elif col in ENTERAS:
+            chunk[col] = pd.to_numeric(chunk[col], downcast="integer")
+        elif col == BOOLEANA:
+            bits = (chunk.pop(col) == VALOR_VERDADERO).values
+        elif chunk[col].dtype == object or pd.api.types.is_string_dtype(chunk[col]):
+            chunk[col] = chunk[col].astype("category")
+    return chunk, bits
+
+
+def leer_csv_compacto(path=CSV_PATH, escenario=None, usecols=None, chunksize=CHUNK_SIZE):
+    """
+    Lee el CSV (con el overlay del escenario, si se indica) en modo compacto.
+    Devuelve (df, defecto_bits, decimales):
+        df            DataFrame con float32 / category / enteros (sin defecto)
+        defecto_bits  np.packbits de (defecto == "Sí"), o None si no se pidió
+        decimales     {medición: decimales detectados o None}
+    """
+    bloques = []
+    bits = []
+    estado = {}
+    for chunk in overlays.leer_csv(path, escenario, usecols=usecols, chunksize=chunksize):
+        chunk, b = _compactar(chunk, estado)
+        bloques.append(chunk)
+        if b is not None:
+            bits.append(b)
+
+    # las categóricas de cada bloque se llevan al conjunto de categorías
+    # común ANTES de concatenar: con categorías distintas pd.concat las
+    # vuelve a convertir en strings (y la memoria vuelve a la del modo normal)
+    categoricas = [col for col in bloques[0].columns
+                   if any(isinstance(b[col].dtype, pd.CategoricalDtype) for b in bloques)]
+    for col in categoricas:
+        comun = union_categoricals([pd.Categorical(b[col].cat.categories) for b in bloques
+                                    if isinstance(b[col].dtype, pd.CategoricalDtype)],
+                                   sort_categories=True)
+        tipo = pd.CategoricalDtype(comun.categories)
+        for b in bloques:
+            b[col] = b[col].astype(tipo)
+    df = pd.concat(bloques, ignore_index=True)
+    defecto_bits = np.packbits(np.concatenate(bits)) if bits else None
+
+    # si un bloque posterior rompió los decimales, quedan en float32 sin
+    # recuperar (error relativo ~6e-8)
+    decimales = {col: e["d"] if e["float32"] and _float32_recuperable(e["d"], e["max"]) else None
+                 for col, e in estado.items()}
+    return df, defecto_bits, decimales
+
+
+# --------------------------------------------------------------
+# REDUCCIONES EN FLOAT64 / COMPENSADAS
+# --------------------------------------------------------------
+
+def es_compacta(x):
+    """True si la serie/array está guardada en float32."""
+    return np.asarray(x).dtype == np.float32
+
+
+def a_float64(x, decimales=None):
+    """Pasa x a float64 y, si se conocen sus decimales, recupera el valor del CSV."""
+    x = np.asarray(x, dtype=np.float64)
+    return np.round(x, decimales) if decimales is not None else x
+
+
+def suma_por_bloques(f, *arrays, decimales=None, bloque=BLOQUE):
+    """
+    Σ f(a1, a2, ...) calculada en float64 por bloques:
+    np.sum (por pares) dentro de cada bloque y math.fsum entre bloques.
+    `decimales` es una lista con los decimales de cada array (o None).
+    """
+    n = len(arrays[0])
+    decimales = decimales or [None] * len(arrays)
+    parciales = []
+    for i in range(0, n, bloque):
+        partes = [a_float64(np.asarray(a)[i:i + bloque], d) for a, d in zip(arrays, decimales)]
+        parciales.append(float(np.sum(f(*partes))))
+    return math.fsum(parciales)
+
+
+def media_y_desvio(x, decimales=None):
+    """Media y desvío muestral (ddof=1) en dos pasadas, sin acumular en float32."""
+    x = np.asarray(x)
+    x = x[~np.isnan(x)]
+    n = len(x)
+    media = suma_por_bloques(lambda v: v, x, decimales=[decimales]) / n
+    sc = suma_por_bloques(lambda v: (v - media)**2, x, decimales=[decimales])
+    return media, math.sqrt(sc / (n - 1))
+
+
+def momento_central(x, k, decimales=None):
+    """m_k = (1/n) Σ (xi - x̄)^k, acumulado en float64."""
+    x = np.asarray(x)
+    x = x[~np.isnan(x)]
+    n = len(x)
+    media = suma_por_bloques(lambda v: v, x, decimales=[decimales]) / n
+    return suma_por_bloques(lambda v: (v - media)**k, x, decimales=[decimales]) / n
+
+
+def contar_verdaderos(bits, mascara=None):
+    """Cantidad de True en los bits empaquetados (opcionalmente solo donde mascara)."""
+    if mascara is not None:
+        bits = bits & np.packbits(np.asarray(mascara, dtype=bool))
+    if hasattr(np, "bitwise_count"):        # NumPy >= 2.0
+        return int(np.bitwise_count(bits).sum())
+    return int(np.unpackbits(bits).sum())
+
+
+def bytes_por_fila(path=CSV_PATH):
+    """(bytes/fila en modo normal, bytes/fila en modo compacto) para el CSV."""
+    normal = pd.read_csv(path)
+    b_normal = normal.memory_usage(deep=True).sum() / len(normal)
+
+    df, bits, _ = leer_csv_compacto(path)
+    total = df.memory_usage(deep=True).sum() + (bits.nbytes if bits is not None else 0)
+    return b_normal, total / len(df)
+
+
+def main():
+    b_normal, b_compacto = bytes_por_fila()
+    print("=== MEMORIA POR FILA ===")
+    print(f"Modo normal   (float64 + strings) = {b_normal:.1f} bytes/fila")
+    print(f"Modo compacto (float32 + int8 + bits) = {b_compacto:.1f} bytes/fila")
+    print(f"Reducción = {b_normal / b_compacto:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+"""
+Modo aproximado: muestras reservorio estratificadas.
+
+Para explorar bases muy grandes no hace falta recorrer todas las filas en
+cada consulta. En UNA pasada (por bloques) se guarda, para cada estrato
+
+    lote_proveedor x turno x categoria_calidad
+
+una muestra aleatoria simple de a lo sumo TAMANIO_ESTRATO filas y el
+tamaño exacto N_h del estrato. La muestra se mantiene con el método de
+claves aleatorias: cada fila recibe U ~ Uniforme(0, 1) y en cada estrato se
+conservan las k filas de menor U. Eso es equivalente a un reservorio y se
+puede seguir actualizando cuando llegan datos nuevos (actualizar_muestra).
+
+Sobre la muestra se calculan, con estimadores estratificados
+(W_h = N_h / N del dominio):
+
+    media:      ȳ = Σ W_h ȳ_h
+    varianza
+    del
+    estimador:  V = Σ W_h^2 (1 - n_h/N_h) s_h^2 / n_h
+    proporción: igual que la media con y = 1 si hay defecto
+
+y el "error de aproximación" z * sqrt(V) acompaña a cada resultado (es lo
+que puede diferir del valor exacto sobre toda la base). La asimetría y la
+curtosis se estiman con momentos ponderados por N_h / n_h; su error sale de
+un jackknife estratificado (se quita una fila por vez, reponderando su
+estrato) con la corrección por población finita:
+
+    V = Σ_h (1 - n_h/N_h) (n_h - 1)/n_h Σ_j (θ_(hj) - θ̄_(h))^2
+
+así que es 0 cuando la muestra contiene todas las filas de cada estrato.
+
+Más filas por estrato = más precisión y más tiempo. tamanio_para_error()
+indica el TAMANIO_ESTRATO necesario para un error objetivo, usando la
+muestra actual como piloto.
+"""
+
+import math
+
+import numpy as np
+import pandas as pd
+
+CSV_PATH = "tomates_calidad.csv"
+CHUNK_SIZE = 200_000
+TAMANIO_ESTRATO = 200        # filas por estrato (precisión vs. tiempo)
+Z_95 = 1.96
+SEMILLA = 2025
+
+ESTRATOS = ["lote_proveedor", "turno", "categoria_calidad"]
+COLUMNAS = ESTRATOS + ["defecto", "diametro_mm", "peso_g"]
+
+
+# --------------------------------------------------------------
+# CONSTRUCCIÓN Y ACTUALIZACIÓN DE LA MUESTRA
+# --------------------------------------------------------------
+
+def nueva_muestra(k=TAMANIO_ESTRATO, semilla=SEMILLA):
+    """Estado vacío: muestra, tamaños N_h y generador aleatorio."""
+    return {
+        "k": k,
+        "muestra": pd.DataFrame(columns=COLUMNAS + ["_clave"]),
+        "N": None,          # tamaños N_h (Series indexada por estrato)
+        "rng": np.random.default_rng(semilla),
+    }
+
+
+def actualizar_muestra(estado, chunk):
+    """Incorpora un bloque de filas nuevas a la muestra y a los N_h."""
+    chunk = chunk[COLUMNAS].dropna(subset=ESTRATOS).copy()
+    if chunk.empty:
+        return estado
+    chunk["_clave"] = estado["rng"].random(len(chunk))
+
+    conteos = chunk.groupby(ESTRATOS).size()
+    if estado["N"] is None:
+        estado["N"] = conteos
+    else:
+        estado["N"] = estado["N"].add(conteos, fill_value=0).astype("int64")
+
+    muestra = estado["muestra"]
+    combinado = chunk if muestra.empty else pd.concat([muestra, chunk], ignore_index=True)
+    estado["muestra"] = (combinado.sort_values("_clave")
+                         .groupby(ESTRATOS, sort=False).head(estado["k"])
+                         .reset_index(drop=True))
+    return estado
+
+
+def construir_muestra(path=CSV_PATH, k=TAMANIO_ESTRATO, chunksize=CHUNK_SIZE, semilla=SEMILLA):
+    """Recorre el CSV una vez y devuelve el estado con la muestra estratificada."""
+    estado = nueva_muestra(k, semilla)
+    for chunk in pd.read_csv(path, usecols=COLUMNAS, chunksize=chunksize):
+        actualizar_muestra(estado, chunk)
+    return estado
+
+
+# --------------------------------------------------------------
+# ESTIMADORES ESTRATIFICADOS
+# --------------------------------------------------------------
+
+def _por_estrato(estado, valores, filtro):
+    """
+    Resumen por estrato (N_h, n_h, media_h, var_h) de la serie `valores`
+    (alineada con la muestra), restringido al dominio `filtro` {col: valor}.
+    """
+    muestra = estado["muestra"]
+    mascara = pd.Series(True, index=muestra.index)
+    for col, valor in (filtro or {}).items():
+        mascara &= muestra[col] == valor
+
+    datos = pd.DataFrame({"y": valores[mascara]}).join(muestra.loc[mascara, ESTRATOS])
+    datos = datos.dropna(subset=["y"])
+    resumen = datos.groupby(ESTRATOS)["y"].agg(n_h="size", media_h="mean", var_h="var")
+    resumen["var_h"] = resumen["var_h"].fillna(0.0)
+    resumen["N_h"] = estado["N"].reindex(resumen.index).values
+    return resumen
+
+
+def media_aprox(estado, columna, filtro=None, z=Z_95):
+    """
+    Media estratificada de `columna` en el dominio `filtro`.
+    Devuelve (media, s, N, error_aprox), con s el desvío estimado de la
+    población y error_aprox = z * error estándar del estimador.
+    """
+    r = _por_estrato(estado, estado["muestra"][columna].astype(float), filtro)
+    N = r["N_h"].sum()
+    W = r["N_h"] / N
+
+    media = (W * r["media_h"]).sum()
+    fpc = 1 - r["n_h"] / r["N_h"]
+    var_est = (W**2 * fpc * r["var_h"] / r["n_h"]).sum()
+
+    # varianza poblacional: dentro de estratos + entre estratos
+    s2 = (((r["N_h"] - 1) * r["var_h"] + r["N_h"] * (r["media_h"] - media)**2).sum()
+          / max(N - 1, 1))
+    return media, math.sqrt(s2), int(N), z * math.sqrt(var_est)
+
+
+def ic_media_aprox(estado, columna, filtro=None, z=Z_95):
+    """
+    IC para la media como en u8_intervalos.ci_media_z, calculado sobre la
+    muestra. Devuelve (media, inf, sup, N, s, error_aprox).
+    """
+    media, s, N, error = media_aprox(estado, columna, filtro, z)
+    se = s / math.sqrt(N)
+    return media, media - z * se, media + z * se, N, s, error
+
+
+def proporcion_aprox(estado, filtro=None, z=Z_95, columna="defecto", valor="Sí"):
+    """Proporción de filas con columna == valor en el dominio. Devuelve (p, N, error_aprox)."""
+    indicadora = (estado["muestra"][columna] == valor).astype(float)
+    r = _por_estrato(estado, indicadora, filtro)
+    N = r["N_h"].sum()
+    W = r["N_h"] / N
+    p = (W * r["media_h"]).sum()
+    fpc = 1 - r["n_h"] / r["N_h"]
+    var_est = (W**2 * fpc * r["var_h"] / r["n_h"]).sum()
+    return p, int(N), z * math.sqrt(var_est)
+
+
+def _forma_desde_sumas(S):
+    """g1 y g2 a partir de las sumas ponderadas S[k] = Σ w d^k, k = 0..4."""
+    S0, S1, S2, S3, S4 = S
+    mu = S1 / S0
+    m2 = S2 / S0 - mu**2
+    m3 = S3 / S0 - 3 * mu * S2 / S0 + 2 * mu**3
+    m4 = S4 / S0 - 4 * mu * S3 / S0 + 6 * mu**2 * S2 / S0 - 3 * mu**4
+    return m3 / m2**1.5, m4 / m2**2 - 3
+
+
+def _varianza_jackknife(theta, estrato, n_h, fpc):
+    """Σ_h fpc_h (n_h - 1)/n_h Σ_j (θ_(hj) - θ̄_(h))^2 (estratos con n_h > 1)."""
+    usar = n_h > 1
+    df = pd.DataFrame({"theta": theta[usar], "estrato": estrato[usar]})
+    centrada = df["theta"] - df.groupby("estrato")["theta"].transform("mean")
+    factor = (fpc * (n_h - 1) / np.where(usar, n_h, 1))[usar]
+    return float((factor * centrada**2).sum())
+
+
+def forma_aprox(estado, columna, z=Z_95):
+    """
+    Asimetría g1 y exceso de curtosis g2 (divisor n, como en
+    u6_simetria_curtosis.py) con momentos ponderados por N_h / n_h.
+    El error es z * desvío del jackknife estratificado (con fpc).
+    Devuelve (g1, error_g1, g2, error_g2).
+    """
+    muestra = estado["muestra"].dropna(subset=[columna])
+    estrato = muestra.groupby(ESTRATOS, sort=False).ngroup().values
+    n_h = np.bincount(estrato)[estrato].astype(float)
+    N_h = estado["N"].reindex(pd.MultiIndex.from_frame(muestra[ESTRATOS])).values.astype(float)
+    w = N_h / n_h
+    x = muestra[columna].astype(float).values
+
+    # centrar en la media ponderada no cambia g1 ni g2 y evita cancelaciones
+    d = x - np.average(x, weights=w)
+    potencias = np.vstack([d**k for k in range(5)])            # 5 x n
+    S = potencias @ w
+    g1, g2 = _forma_desde_sumas(S)
+
+    # réplicas: sin la fila j, el resto de su estrato pasa a pesar N_h / (n_h - 1)
+    T_h = np.vstack([np.bincount(estrato, weights=p) for p in potencias])[:, estrato]
+    con_resto = n_h > 1
+    w_resto = np.where(con_resto, N_h / np.where(con_resto, n_h - 1, 1), 0.0)
+    S_rep = S[:, None] - w * T_h + w_resto * (T_h - potencias)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        g1_rep, g2_rep = _forma_desde_sumas(S_rep)
+
+    fpc = 1 - n_h / N_h
+    v1 = _varianza_jackknife(g1_rep, estrato, n_h, fpc)
+    v2 = _varianza_jackknife(g2_rep, estrato, n_h, fpc)
+    return g1, z * math.sqrt(v1), g2, z * math.sqrt(v2)
+
+
+def tamanio_para_error(estado, columna, error_objetivo, filtro=None, z=Z_95):
+    """
+    TAMANIO_ESTRATO aproximado para que el error de aproximación de la
+    media de `columna` sea <= error_objetivo (ignorando la corrección por
+    población finita):  k = z^2 Σ W_h^2 s_h^2 / E^2
+    """
+    r = _por_estrato(estado, estado["muestra"][columna].astype(float), filtro)
+    W = r["N_h"] / r["N_h"].sum()
+    return int(math.ceil(z**2 * (W**2 * r["var_h"]).sum() / error_objetivo**2))
+
+
+def main():
+    estado = construir_muestra()
+    n_muestra = len(estado["muestra"])
+    N_total = int(estado["N"].sum())
+
+    print("=== MODO APROXIMADO (muestras reservorio estratificadas) ===")
+    print(f"Estratos: {' x '.join(ESTRATOS)} ({len(estado['N'])} con datos)")
+    print(f"Filas por estrato (máx.) = {estado['k']}")
+    print(f"Muestra = {n_muestra} de {N_total} filas\n")
+
+    print("=== IC 95% para la media de peso (g), por turno ===")
+    for turno in sorted(estado["muestra"]["turno"].unique()):
+        media, inf, sup, N, s, error = ic_media_aprox(estado, "peso_g", {"turno": turno})
+        print(f"Turno {turno} (N = {N}):")
+        print(f"  media = {media:.3f} g  (± {error:.3f} por aproximación)")
+        print(f"  s = {s:.3f} g")
+        print(f"  IC 95% = ({inf:.3f} ; {sup:.3f}) g\n")
+
+    print("=== Proporción de defectuosos por productor ===")
+    for lote in sorted(estado["muestra"]["lote_proveedor"].unique()):
+        p, N, error = proporcion_aprox(estado, {"lote_proveedor": lote})
+        print(f"  Productor {lote} (N = {N}): p̂ = {p:.4f}  (± {error:.4f})")
+
+    print("\n=== Forma de la distribución ===")
+    for columna, nombre in [("diametro_mm", "Diámetro (mm)"), ("peso_g", "Peso (g)")]:
+        g1, e1, g2, e2 = forma_aprox(estado, columna)
+        print(f"  {nombre}: g1 = {g1:.4f} (± {e1:.4f}), g2 = {g2:.4f} (± {e2:.4f})")
+
+    k = tamanio_para_error(estado, "peso_g", 0.5)
+    print(f"\nPara un error de ±0.5 g en la media de peso: TAMANIO_ESTRATO ≈ {k}")
+
+
+if __name__ == "__main__":
+    main()
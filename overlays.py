@@ -0,0 +1,182 @@
+"""
+Columnas derivadas como "overlays" en lugar de copias completas del CSV.
+
+Antes, ajustar_regresion.py reescribía toda la base en
+tomates_calidad_regenerado.csv solo para cambiar peso_g. Ahora cada
+escenario guarda únicamente las columnas que cambia:
+
+    overlays/<escenario>/
+        id_tomate.npy       clave de unión con la base
+        <columna>.npy       una columna por archivo (formato .npy de NumPy)
+        manifiesto.json     base de origen, su huella y las columnas del escenario
+
+Regenerar una columna cuesta E/S proporcional a esa columna, y varios
+escenarios pueden convivir sobre la misma base. Los .npy se abren con
+mmap_mode="r" (sin copiar a memoria): al leer, solo se toma la porción
+que corresponde a cada bloque de la base.
+
+leer_csv() se usa como pd.read_csv (con usecols y chunksize) y devuelve
+las columnas de la base con las del escenario reemplazadas/agregadas,
+unidas por id_tomate. Si las filas del overlay están en el mismo orden
+que la base (el caso normal) la unión es por posición; si no, se busca
+cada id_tomate.
+"""
+
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+import cache_resultados as cache
+
+OVERLAY_DIR = "overlays"
+BASE_CSV = "tomates_calidad.csv"
+CLAVE = "id_tomate"
+MANIFIESTO = "manifiesto.json"
+ESCENARIO_REGENERADO = "regenerado"    # peso_g regenerado por ajustar_regresion.py
+
+
+# --------------------------------------------------------------
+# ESCRITURA
+# --------------------------------------------------------------
+
+def _carpeta(escenario, overlay_dir=OVERLAY_DIR):
+    return os.path.join(overlay_dir, escenario)
+
+
+def leer_manifiesto(escenario, overlay_dir=OVERLAY_DIR):
+    """Manifiesto del escenario ({} si todavía no existe)."""
+    ruta = os.path.join(_carpeta(escenario, overlay_dir), MANIFIESTO)
+    try:
+        with open(ruta, encoding="utf-8") as f:
+            return json.load(f)
+    except OSError:
+        return {}
+
+
+def _guardar_npy(ruta, valores):
+    tmp = ruta + ".tmp.npy"
+    np.save(tmp, valores)
+    os.replace(tmp, ruta)
+
+
+def _huella_array(valores):
+    return hashlib.blake2b(np.ascontiguousarray(valores).tobytes(), digest_size=16).hexdigest()
+
+
+def guardar_columna(escenario, columna, ids, valores, base=BASE_CSV, overlay_dir=OVERLAY_DIR):
+    """
+    Guarda `valores` como la columna `columna` del escenario, asociada a
+    los `ids` (id_tomate) de cada fila.
+    """
+    ids = np.asarray(ids)
+    valores = np.asarray(valores)
+    if len(ids) != len(valores):
+        raise ValueError("ids y valores deben tener el mismo largo")
+
+    carpeta = _carpeta(escenario, overlay_dir)
+    os.makedirs(carpeta, exist_ok=True)
+    manifiesto = leer_manifiesto(escenario, overlay_dir)
+
+    huella_ids = _huella_array(ids)
+    if manifiesto.get("huella_ids") != huella_ids:
+        if manifiesto.get("columnas"):
+            # las columnas anteriores quedaron con otras claves: se descartan
+            for vieja in manifiesto["columnas"]:
+                os.remove(os.path.join(carpeta, vieja + ".npy"))
+        manifiesto["columnas"] = {}
+        _guardar_npy(os.path.join(carpeta, CLAVE + ".npy"), ids)
+
+    _guardar_npy(os.path.join(carpeta, columna + ".npy"), valores)
+
+    manifiesto.update({
+        "base": base,
+        "huella_base": cache.huella_archivo(base),
+        "huella_ids": huella_ids,
+    })
+    manifiesto.setdefault("columnas", {})[columna] = {
+        "dtype": str(valores.dtype),
+        "huella": _huella_array(valores),
+    }
+    with open(os.path.join(carpeta, MANIFIESTO), "w", encoding="utf-8") as f:
+        json.dump(manifiesto, f, indent=2, sort_keys=True)
+
+
+def version(escenario, overlay_dir=OVERLAY_DIR):
+    """Identificador del contenido del escenario (cambia si cambia alguna columna)."""
+    if escenario is None:
+        return None
+    manifiesto = leer_manifiesto(escenario, overlay_dir)
+    contenido = json.dumps(manifiesto, sort_keys=True)
+    return hashlib.blake2b(contenido.encode("utf-8"), digest_size=16).hexdigest()
+
+
+# --------------------------------------------------------------
+# LECTURA
+# --------------------------------------------------------------
+
+def leer_columna(escenario, columna, overlay_dir=OVERLAY_DIR):
+    """Columna del escenario como array mapeado en memoria (solo lectura)."""
+    return np.load(os.path.join(_carpeta(escenario, overlay_dir), columna + ".npy"),
+                   mmap_mode="r")
+
+
+def _unir(chunk, escenario, columnas, inicio, ids_overlay, overlay_dir, indice):
+    """Agrega al bloque las columnas del overlay, alineadas por id_tomate."""
+    ids_chunk = chunk[CLAVE].values
+    fin = inicio + len(chunk)
+    if fin <= len(ids_overlay) and np.array_equal(ids_overlay[inicio:fin], ids_chunk):
+        posiciones = slice(inicio, fin)
+    else:
+        if indice[0] is None:
+            indice[0] = pd.Index(np.asarray(ids_overlay))
+        posiciones = indice[0].get_indexer(ids_chunk)
+        if (posiciones < 0).any():
+            raise KeyError(f"hay {CLAVE} de la base sin valor en el escenario '{escenario}'")
+
+    for col in columnas:
+        chunk[col] = np.asarray(leer_columna(escenario, col, overlay_dir)[posiciones])
+    return chunk
+
+
+def _bloques(path, escenario, usecols, chunksize, overlay_dir):
+    manifiesto = leer_manifiesto(escenario, overlay_dir)
+    if not manifiesto:
+        raise FileNotFoundError(f"no existe el escenario '{escenario}' en {overlay_dir}/")
+    if manifiesto.get("huella_base") != cache.huella_archivo(path):
+        print(f"Aviso: {path} cambió desde que se generó el escenario '{escenario}'.")
+
+    cabecera = list(pd.read_csv(path, nrows=0).columns)
+    de_overlay = list(manifiesto["columnas"])
+    pedidas = list(usecols) if usecols is not None else cabecera + [
+        c for c in de_overlay if c not in cabecera]
+    columnas_overlay = [c for c in pedidas if c in de_overlay]
+    columnas_base = [c for c in cabecera if c in pedidas and c not in de_overlay]
+    orden = [c for c in cabecera if c in pedidas] + [c for c in pedidas if c not in cabecera]
+
+    leer = columnas_base + ([CLAVE] if CLAVE not in columnas_base else [])
+    ids_overlay = leer_columna(escenario, CLAVE, overlay_dir)
+    indice = [None]   # pd.Index de ids, solo si hace falta buscar por clave
+
+    inicio = 0
+    for chunk in pd.read_csv(path, usecols=leer, chunksize=chunksize or 1_000_000):
+        largo = len(chunk)
+        chunk = _unir(chunk, escenario, columnas_overlay, inicio, ids_overlay, overlay_dir, indice)
+        inicio += largo
+        yield chunk[orden]
+
+
+def leer_csv(path=BASE_CSV, escenario=None, usecols=None, chunksize=None, overlay_dir=OVERLAY_DIR):
+    """
+    Como pd.read_csv(path, usecols=..., chunksize=...), pero con las
+    columnas del escenario superpuestas. Sin escenario es pd.read_csv.
+    """
+    if escenario is None:
+        return pd.read_csv(path, usecols=usecols, chunksize=chunksize)
+
+    bloques = _bloques(path, escenario, usecols, chunksize, overlay_dir)
+    if chunksize is not None:
+        return bloques
+    return pd.concat(list(bloques), ignore_index=True)
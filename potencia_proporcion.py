@@ -0,0 +1,177 @@
+"""
+Potencia y tamaño de muestra del test de proporción de
+test_proporcion_productorA.py por simulación Monte Carlo.
+
+Test:
+    H0: p = P0 (0.15)
+    H1: p < P0       (cola izquierda, alfa = ALFA)
+
+Para cada combinación (p verdadera, n) de la grilla se simulan N_REPS
+muestras X ~ Binomial(n, p) y la potencia estimada es la proporción de
+muestras en las que se rechaza H0. Se usan dos reglas de decisión:
+
+    - Normal (la del script):  Z = (X/n - P0) / sqrt(P0 (1 - P0) / n) < Z_CRITICO
+      que equivale a  X < n P0 + Z_CRITICO sqrt(n P0 (1 - P0))
+    - Binomial exacta:         P(X <= x | P0) <= ALFA
+      que equivale a  X <= k_n, con k_n el mayor k con F_{n,P0}(k) <= ALFA
+
+Como ambas reglas se reducen a comparar X con un umbral que solo depende
+de n, los umbrales se calculan una vez y la simulación es una comparación
+vectorizada sobre bloques (reps x p x n). Dentro de cada réplica los
+tamaños de muestra se anidan: X(n_j) = X(n_{j-1}) + Binomial(n_j - n_{j-1}, p),
+así se sortean incrementos chicos (mucho más baratos que Binomial(n, p)) y
+una suma acumulada da X para toda la fila de n. Cada celda sigue teniendo
+exactamente distribución Binomial(n, p). Las réplicas se reparten entre
+procesos, cada uno con su propio generador (SeedSequence.spawn), así que el
+resultado es reproducible para una SEMILLA dada.
+
+Además se informa el n mínimo de la grilla que alcanza POTENCIA_OBJETIVO
+para cada p. potencia_exacta() da el valor teórico con la CDF binomial,
+útil para controlar la simulación.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from scipy.stats import binom
+
+from test_proporcion_productorA import P0, ALFA, Z_CRITICO
+
+P_GRILLA = np.linspace(0.01, 0.15, 100)      # proporciones verdaderas de defectuosos
+N_GRILLA = np.arange(10, 1010, 10)           # tamaños de muestra
+N_REPS = 100_000                             # réplicas por celda
+BLOQUE_REPS = 250                            # réplicas por bloque vectorizado
+POTENCIA_OBJETIVO = 0.80
+SEMILLA = 12345
+N_WORKERS = os.cpu_count() or 1
+
+
+# --------------------------------------------------------------
+# UMBRALES DE RECHAZO (dependen solo de n)
+# --------------------------------------------------------------
+
+def umbrales_normal(n_grilla, p0=P0, z_critico=Z_CRITICO):
+    """Se rechaza si X < umbral (regla de la aproximación normal)."""
+    n = np.asarray(n_grilla, dtype=float)
+    return n * p0 + z_critico * np.sqrt(n * p0 * (1 - p0))
+
+
+def umbrales_exactos(n_grilla, p0=P0, alfa=ALFA):
+    """Se rechaza si X <= umbral (regla binomial exacta); -1 si nunca se rechaza."""
+    umbrales = []
+    for n in n_grilla:
+        k = int(binom.ppf(alfa, n, p0))          # menor k con F(k) >= alfa
+        while k >= 0 and binom.cdf(k, n, p0) > alfa:
+            k -= 1
+        umbrales.append(k)
+    return np.array(umbrales)
+
+
+# --------------------------------------------------------------
+# SIMULACIÓN
+# --------------------------------------------------------------
+
+def _simular(semilla, reps, p_grilla, n_grilla, u_normal, u_exacto, bloque=BLOQUE_REPS):
+    """
+    Cuenta rechazos de cada regla en `reps` réplicas por celda.
+    Devuelve dos matrices (len(p) x len(n)) de conteos.
+    """
+    rng = np.random.default_rng(semilla)
+    p = np.asarray(p_grilla)[:, None]
+    n = np.asarray(n_grilla)
+    incrementos = np.diff(n, prepend=0)[None, :]      # n_grilla creciente
+    rech_normal = np.zeros((p.shape[0], len(n)), dtype=np.int64)
+    rech_exacto = np.zeros_like(rech_normal)
+
+    hechas = 0
+    while hechas < reps:
+        m = min(bloque, reps - hechas)
+        X = rng.binomial(incrementos, p, size=(m, p.shape[0], len(n))).cumsum(axis=2)
+        rech_normal += (X < u_normal).sum(axis=0)
+        rech_exacto += (X <= u_exacto).sum(axis=0)
+        hechas += m
+    return rech_normal, rech_exacto
+
+
+def simular_potencia(p_grilla=P_GRILLA, n_grilla=N_GRILLA, n_reps=N_REPS,
+                     semilla=SEMILLA, n_workers=N_WORKERS):
+    """
+    Devuelve (potencia_normal, potencia_exacta) como DataFrames con
+    índice p y columnas n.
+    """
+    n_grilla = np.sort(np.asarray(n_grilla))
+    u_normal = umbrales_normal(n_grilla)
+    u_exacto = umbrales_exactos(n_grilla)
+
+    n_workers = max(1, min(n_workers, n_reps))
+    reps = [n_reps // n_workers + (i < n_reps % n_workers) for i in range(n_workers)]
+    semillas = np.random.SeedSequence(semilla).spawn(n_workers)
+
+    if n_workers == 1:
+        resultados = [_simular(semillas[0], reps[0], p_grilla, n_grilla, u_normal, u_exacto)]
+    else:
+        with ProcessPoolExecutor(max_workers=n_workers) as ex:
+            futuros = [ex.submit(_simular, s, r, p_grilla, n_grilla, u_normal, u_exacto)
+                       for s, r in zip(semillas, reps)]
+            resultados = [f.result() for f in futuros]
+
+    rech_normal = sum(r[0] for r in resultados)
+    rech_exacto = sum(r[1] for r in resultados)
+
+    def tabla(conteos):
+        return pd.DataFrame(conteos / n_reps, index=pd.Index(p_grilla, name="p"),
+                            columns=pd.Index(n_grilla, name="n"))
+
+    return tabla(rech_normal), tabla(rech_exacto)
+
+
+def potencia_exacta(p_grilla=P_GRILLA, n_grilla=N_GRILLA):
+    """Potencia teórica de ambas reglas: P(X < u) y P(X <= k) bajo Binomial(n, p)."""
+    p = np.asarray(p_grilla)[:, None]
+    n = np.asarray(n_grilla)[None, :]
+    u_normal = np.ceil(umbrales_normal(n_grilla)) - 1     # X < u  <=>  X <= ceil(u) - 1
+    u_exacto = umbrales_exactos(n_grilla)
+
+    def tabla(valores):
+        return pd.DataFrame(valores, index=pd.Index(p_grilla, name="p"),
+                            columns=pd.Index(n_grilla, name="n"))
+
+    return tabla(binom.cdf(u_normal, n, p)), tabla(binom.cdf(u_exacto, n, p))
+
+
+def n_minimo(potencia, objetivo=POTENCIA_OBJETIVO):
+    """Para cada p, el menor n de la grilla con potencia >= objetivo (NaN si ninguno)."""
+    alcanza = potencia.values >= objetivo
+    n = potencia.columns.values
+    minimos = np.where(alcanza.any(axis=1), n[alcanza.argmax(axis=1)], np.nan)
+    return pd.Series(minimos, index=potencia.index, name="n_minimo")
+
+
+def main():
+    pot_normal, pot_exacta = simular_potencia()
+
+    print("=== Potencia del test de proporción (H0: p = "
+          f"{P0:.2f}, H1: p < {P0:.2f}, alfa = {ALFA:.2f}) ===")
+    print(f"Grilla: {len(P_GRILLA)} valores de p x {len(N_GRILLA)} valores de n, "
+          f"{N_REPS} réplicas por celda\n")
+
+    filas = np.linspace(0, len(P_GRILLA) - 1, 8).astype(int)
+    columnas = [c for c in (20, 50, 100, 200, 500, 1000) if c in pot_normal.columns]
+
+    print("Potencia (regla normal), algunas celdas:")
+    print(pot_normal.iloc[filas][columnas].round(3).to_string(), "\n")
+    print("Potencia (regla binomial exacta), algunas celdas:")
+    print(pot_exacta.iloc[filas][columnas].round(3).to_string(), "\n")
+
+    resumen = pd.DataFrame({
+        "n_min_normal": n_minimo(pot_normal),
+        "n_min_exacta": n_minimo(pot_exacta),
+    })
+    print(f"=== n mínimo para potencia >= {POTENCIA_OBJETIVO:.2f} ===")
+    print(resumen.iloc[filas].to_string())
+
+
+if __name__ == "__main__":
+    main()
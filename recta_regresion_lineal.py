@@ -11,6 +11,8 @@ Archivo esperado: "tomates_calidad.csv" en la misma carpeta, con
 las columnas:
     - diametro_mm
     - peso_g
+(peso_g se toma del escenario "regenerado" de ajustar_regresion.py,
+ver overlays.py)
 
 Salidas:
     - n, sumas y promedios
@@ -24,26 +26,45 @@ Salidas:
 """
 
 import math
-import pandas as pd
 
-CSV_PATH = "tomates_calidad_regenerado.csv"
+import cache_resultados as cache
+import modo_compacto
+import overlays
 
-def main():
-    # Leer datos
-    df = pd.read_csv(CSV_PATH)
+CSV_PATH = overlays.BASE_CSV
+ESCENARIO = overlays.ESCENARIO_REGENERADO
 
-    # Cambiá estos nombres si tus columnas se llaman distinto
-    x = df["diametro_mm"].astype(float).values
-    y = df["peso_g"].astype(float).values
+def calcular_recta(path=CSV_PATH, escenario=ESCENARIO):
+    """Calcula sumas, coeficientes y medidas del ajuste. Devuelve un dict."""
+    # Leer datos
+    if modo_compacto.ACTIVO:
+        # float32 en memoria; las sumas se acumulan en float64 por bloques
+        df, _, dec = modo_compacto.leer_csv_compacto(path, escenario,
+                                                     usecols=["diametro_mm", "peso_g"])
+        x = df["diametro_mm"].values
+        y = df["peso_g"].values
+        decimales = [dec.get("diametro_mm"), dec.get("peso_g")]
+
+        def suma(f):
+            return modo_compacto.suma_por_bloques(f, x, y, decimales=decimales)
+    else:
+        df = overlays.leer_csv(path, escenario, usecols=["diametro_mm", "peso_g"])
+
+        # Cambiá estos nombres si tus columnas se llaman distinto
+        x = df["diametro_mm"].astype(float).values
+        y = df["peso_g"].astype(float).values
+
+        def suma(f):
+            return f(x, y).sum()
 
     n = len(x)
 
     # --- 1) Sumas básicas ---
-    sum_x  = x.sum()
-    sum_y  = y.sum()
-    sum_x2 = (x**2).sum()
-    sum_y2 = (y**2).sum()
-    sum_xy = (x*y).sum()
+    sum_x  = suma(lambda x, y: x)
+    sum_y  = suma(lambda x, y: y)
+    sum_x2 = suma(lambda x, y: x**2)
+    sum_y2 = suma(lambda x, y: y**2)
+    sum_xy = suma(lambda x, y: x*y)
 
     x_bar = sum_x / n
     y_bar = sum_y / n
@@ -58,14 +79,12 @@ def main():
     beta0_hat = y_bar - beta1_hat*x_bar  # ordenada al origen
 
     # Recta estimada: y_hat = beta0_hat + beta1_hat * x
-    y_hat = beta0_hat + beta1_hat * x
-    residuos = y - y_hat
 
     # --- 4) Sumas de cuadrados ---
     # SCT = suma (yi - y_bar)^2 = Syy
     SCT = Syy
     # SCE = suma (yi - y_hat)^2
-    SCE = (residuos**2).sum()
+    SCE = suma(lambda x, y: (y - (beta0_hat + beta1_hat * x))**2)
     # SCR = SCT - SCE
     SCR = SCT - SCE
 
@@ -77,6 +96,35 @@ def main():
     R2 = SCR / SCT
     r  = Sxy / math.sqrt(Sxx * Syy)
 
+    return {
+        "n": n, "sum_x": sum_x, "sum_y": sum_y, "sum_x2": sum_x2,
+        "sum_y2": sum_y2, "sum_xy": sum_xy, "x_bar": x_bar, "y_bar": y_bar,
+        "Sxx": Sxx, "Syy": Syy, "Sxy": Sxy,
+        "beta0_hat": beta0_hat, "beta1_hat": beta1_hat,
+        "SCT": SCT, "SCE": SCE, "SCR": SCR, "s2": s2, "s": s, "R2": R2, "r": r,
+    }
+
+def recta_cacheada(path=CSV_PATH, escenario=ESCENARIO):
+    """calcular_recta() cacheado mientras no cambien el CSV ni el escenario."""
+    return cache.memoizar(
+        "recta_regresion", path,
+        {"escenario": escenario, "version": overlays.version(escenario),
+         "compacto": modo_compacto.ACTIVO},
+        calcular_recta, path, escenario,
+    )
+
+def main():
+    res = recta_cacheada()
+    n = res["n"]
+    sum_x, sum_y = res["sum_x"], res["sum_y"]
+    sum_x2, sum_y2, sum_xy = res["sum_x2"], res["sum_y2"], res["sum_xy"]
+    x_bar, y_bar = res["x_bar"], res["y_bar"]
+    Sxx, Syy, Sxy = res["Sxx"], res["Syy"], res["Sxy"]
+    beta0_hat, beta1_hat = res["beta0_hat"], res["beta1_hat"]
+    SCT, SCE, SCR = res["SCT"], res["SCE"], res["SCR"]
+    s2, s = res["s2"], res["s"]
+    R2, r = res["R2"], res["r"]
+
     # --- 7) Mostrar resultados ---
     print("=== DATOS BÁSICOS ===")
     print(f"n       = {n}")
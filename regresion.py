@@ -3,12 +3,13 @@
 # ==============================================================
 
 import numpy as np
-import pandas as pd
 import matplotlib.pyplot as plt
 import statsmodels.api as sm
 from statsmodels.stats.diagnostic import het_breuschpagan
 from scipy.stats import shapiro, pearsonr
-import scipy.stats as stats
+
+import graficos_agregados as ga
+import overlays
 
 plt.style.use("default")
 
@@ -16,7 +17,9 @@ plt.style.use("default")
 # 1) CARGAR CSV
 # --------------------------------------------------------------
 
-df = pd.read_csv("tomates_calidad_regenerado.csv")
+# Base + peso_g regenerado por ajustar_regresion.py (overlay)
+df = overlays.leer_csv(overlays.BASE_CSV, overlays.ESCENARIO_REGENERADO,
+                       usecols=["diametro_mm", "peso_g"])
 
 # Usaremos diametro_mm para explicar peso_g
 X = df["diametro_mm"].values
@@ -39,7 +42,7 @@ print(model.summary())
 
 # A) Gráfico solo con puntos
 plt.figure(figsize=(7,5))
-plt.scatter(X, Y, alpha=0.7, label="Datos")
+ga.dispersion(X, Y, alpha=0.7, label="Datos")
 plt.xlabel("Diámetro (mm)")
 plt.ylabel("Peso (g)")
 plt.title("SUPUESTO 1: Linealidad – Solo los puntos")
@@ -47,9 +50,11 @@ plt.legend()
 plt.show()
 
 # B) Puntos + recta estimada
+# (la recta se dibuja con sus dos extremos, no con los n puntos)
+x_recta = np.array([X.min(), X.max()])
 plt.figure(figsize=(7,5))
-plt.scatter(X, Y, alpha=0.7, label="Datos")
-plt.plot(X, model.predict(X_sm), linewidth=2, label="Recta estimada")
+ga.dispersion(X, Y, alpha=0.7, label="Datos")
+plt.plot(x_recta, model.predict(sm.add_constant(x_recta)), linewidth=2, label="Recta estimada")
 plt.xlabel("Diámetro (mm)")
 plt.ylabel("Peso (g)")
 plt.title("SUPUESTO 1: Linealidad – Recta ajustada")
@@ -61,8 +66,7 @@ residuos = model.resid
 ajustados = model.fittedvalues
 
 plt.figure(figsize=(7,5))
-plt.scatter(ajustados, residuos)
-plt.axhline(0, color="black")
+ga.residuos_vs_ajustados(ajustados, residuos)
 plt.xlabel("Valores ajustados")
 plt.ylabel("Residuos")
 plt.title("SUPUESTO 1: Linealidad – Residuos vs Ajustados")
@@ -74,14 +78,15 @@ plt.show()
 
 # Histograma
 plt.figure(figsize=(7,5))
-plt.hist(residuos, bins=10, edgecolor="black")
+ga.histograma(residuos, bins=10, edgecolor="black")
 plt.title("SUPUESTO 2: Normalidad – Histograma de residuos")
 plt.xlabel("Residuo")
 plt.ylabel("Frecuencia")
 plt.show()
 
 # QQ-Plot
-stats.probplot(residuos, dist="norm", plot=plt)
+plt.figure()
+ga.qq_normal(residuos)
 plt.title("QQ-Plot")
 plt.show()
 
@@ -109,8 +114,7 @@ print("\n=== SUPUESTO 4: Independencia (Durbin-Watson) ===")
 print(f"Durbin-Watson = {dw:.4f}")
 
 plt.figure(figsize=(7,5))
-plt.plot(residuos, marker="o")
-plt.axhline(0, color="black")
+ga.serie_residuos(residuos)
 plt.title("Residuos ordenados – chequeo de independencia")
 plt.xlabel("Índice de observación")
 plt.ylabel("Residuo")
@@ -0,0 +1,250 @@
+"""
+Regresión lineal múltiple "fuera de memoria" (out-of-core) para el peso.
+
+Modelo:
+    peso_g ~ diametro_mm + turno + lote_proveedor + categoria_calidad
+             + diametro_mm x (turno + lote_proveedor + categoria_calidad)
+
+Las variables categóricas entran como dummies (se omite el primer nivel
+de cada una, que queda como referencia) y las interacciones son
+diametro_mm multiplicado por cada dummy.
+
+En lugar de armar la matriz X completa (como hace sm.OLS en regresion.py)
+se leen los datos por bloques (chunks) y cada bloque aporta sus sumas:
+
+    X'X,  X'y,  y'y,  n,  Σy
+
+Las sumas son aditivas, así que cada bloque se procesa en un proceso
+distinto y al final se suman. Con eso se resuelven las ecuaciones normales
+
+    (X'X) b = X'y
+
+con la factorización de Cholesky X'X = L L' (si X'X no es definida
+positiva, por ejemplo por un nivel sin datos, se usa mínimos cuadrados
+con SVD sobre X'X).
+
+Para que X'X quede bien condicionado, diametro_mm se centra con su media
+(calculada en la primera pasada). La pendiente no cambia, pero el
+intercepto y los efectos de las dummies se leen "en el diámetro promedio".
+
+Salidas:
+    - coeficientes, errores estándar, estadístico t y p-valor
+    - R^2 y R^2 ajustado
+    - s^2 (varianza residual) y s
+
+Archivo esperado: "tomates_calidad.csv" con columnas
+    diametro_mm, peso_g, turno, lote_proveedor, categoria_calidad
+(peso_g se toma del escenario "regenerado" de ajustar_regresion.py,
+ver overlays.py)
+"""
+
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from scipy.stats import t as t_dist
+
+import overlays
+
+CSV_PATH = overlays.BASE_CSV
+ESCENARIO = overlays.ESCENARIO_REGENERADO
+CHUNK_SIZE = 200_000          # filas por bloque
+N_WORKERS = os.cpu_count() or 1
+
+RESPUESTA = "peso_g"
+NUMERICA = "diametro_mm"
+CATEGORICAS = ["turno", "lote_proveedor", "categoria_calidad"]
+
+
+# --------------------------------------------------------------
+# 1) PRIMERA PASADA: niveles de las categóricas y media del diámetro
+# --------------------------------------------------------------
+
+def explorar_csv(path=CSV_PATH, chunksize=CHUNK_SIZE, escenario=ESCENARIO):
+    """
+    Recorre el CSV una vez (solo las columnas necesarias) y devuelve
+    (niveles, media_x), donde niveles es un dict {columna: [niveles ordenados]}.
+    """
+    niveles = {col: set() for col in CATEGORICAS}
+    suma_x = 0.0
+    n_x = 0
+    for chunk in overlays.leer_csv(path, escenario, usecols=CATEGORICAS + [NUMERICA, RESPUESTA],
+                                   chunksize=chunksize):
+        chunk = chunk.dropna()
+        for col in CATEGORICAS:
+            niveles[col].update(chunk[col].astype(str).unique())
+        suma_x += chunk[NUMERICA].astype(float).sum()
+        n_x += len(chunk)
+    niveles = {col: sorted(v) for col, v in niveles.items()}
+    media_x = suma_x / n_x if n_x > 0 else 0.0
+    return niveles, media_x
+
+
+def nombres_columnas(niveles):
+    """Nombres de las columnas de X en el mismo orden que armar_X()."""
+    nombres = ["const", NUMERICA]
+    dummies = [f"{col}[{nivel}]" for col in CATEGORICAS for nivel in niveles[col][1:]]
+    nombres += dummies
+    nombres += [f"{NUMERICA}:{d}" for d in dummies]
+    return nombres
+
+
+def armar_X(chunk, niveles, media_x):
+    """Matriz de diseño de un bloque (intercepto, x centrado, dummies, interacciones)."""
+    x = chunk[NUMERICA].astype(float).values - media_x
+    columnas = [np.ones(len(chunk)), x]
+
+    dummies = []
+    for col in CATEGORICAS:
+        valores = chunk[col].astype(str).values
+        for nivel in niveles[col][1:]:
+            dummies.append((valores == nivel).astype(float))
+
+    columnas += dummies
+    columnas += [x * d for d in dummies]
+    return np.column_stack(columnas)
+
+
+# --------------------------------------------------------------
+# 2) SUMAS POR BLOQUE (se ejecuta en los procesos trabajadores)
+# --------------------------------------------------------------
+
+def sumas_bloque(chunk, niveles, media_x):
+    """
+    Devuelve las sumas suficientes de un bloque:
+    (X'X, X'y, y'y, n, Σy).
+    """
+    chunk = chunk.dropna(subset=CATEGORICAS + [NUMERICA, RESPUESTA])
+    X = armar_X(chunk, niveles, media_x)
+    y = chunk[RESPUESTA].astype(float).values
+    return X.T @ X, X.T @ y, float(y @ y), len(y), float(y.sum())
+
+
+def acumular_sumas(path=CSV_PATH, niveles=None, media_x=0.0,
+                   chunksize=CHUNK_SIZE, n_workers=N_WORKERS, escenario=ESCENARIO):
+    """
+    Segunda pasada: reparte los bloques entre procesos y suma sus aportes.
+    Se mantienen a lo sumo 2 * n_workers bloques en vuelo para que la
+    memoria no crezca con el tamaño del archivo.
+    """
+    p = len(nombres_columnas(niveles))
+    XtX = np.zeros((p, p))
+    Xty = np.zeros(p)
+    yty = 0.0
+    n = 0
+    sum_y = 0.0
+
+    def sumar(resultado):
+        nonlocal XtX, Xty, yty, n, sum_y
+        XtX_b, Xty_b, yty_b, n_b, sum_y_b = resultado
+        XtX += XtX_b
+        Xty += Xty_b
+        yty += yty_b
+        n += n_b
+        sum_y += sum_y_b
+
+    lector = overlays.leer_csv(path, escenario, usecols=CATEGORICAS + [NUMERICA, RESPUESTA],
+                               chunksize=chunksize)
+
+    if n_workers <= 1:
+        for chunk in lector:
+            sumar(sumas_bloque(chunk, niveles, media_x))
+    else:
+        with ProcessPoolExecutor(max_workers=n_workers) as ex:
+            pendientes = []
+            for chunk in lector:
+                pendientes.append(ex.submit(sumas_bloque, chunk, niveles, media_x))
+                if len(pendientes) >= 2 * n_workers:
+                    sumar(pendientes.pop(0).result())
+            for fut in pendientes:
+                sumar(fut.result())
+
+    return XtX, Xty, yty, n, sum_y
+
+
+# --------------------------------------------------------------
+# 3) RESOLVER LAS ECUACIONES NORMALES
+# --------------------------------------------------------------
+
+def resolver_ols(XtX, Xty, yty, n, sum_y):
+    """
+    Resuelve (X'X) b = X'y y calcula las medidas del ajuste.
+    Devuelve un dict con beta, se, t, p, R2, R2_aj, s2, s, n, gl.
+    """
+    p = len(Xty)
+    try:
+        L = np.linalg.cholesky(XtX)
+        # L z = X'y  ->  L' b = z
+        z = np.linalg.solve(L, Xty)
+        beta = np.linalg.solve(L.T, z)
+        L_inv = np.linalg.inv(L)
+        XtX_inv = L_inv.T @ L_inv
+        rango = p
+    except np.linalg.LinAlgError:
+        # X'X singular (ej.: combinación de niveles sin observaciones)
+        beta, _, rango, _ = np.linalg.lstsq(XtX, Xty, rcond=None)
+        XtX_inv = np.linalg.pinv(XtX)
+
+    gl = n - rango
+    if gl <= 0:
+        raise ValueError(f"no se puede estimar el modelo: {n} observaciones para "
+                         f"{rango} coeficientes (gl = {gl})")
+    SCE = max(yty - beta @ Xty, 0.0)          # Σ (y - ŷ)^2
+    SCT = yty - sum_y**2 / n                  # Σ (y - ȳ)^2
+    s2 = SCE / gl
+    s = math.sqrt(s2)
+
+    se = np.sqrt(np.clip(np.diag(XtX_inv), 0.0, None) * s2)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t_stat = beta / se
+    p_valor = 2 * t_dist.sf(np.abs(t_stat), gl)
+
+    R2 = 1 - SCE / SCT
+    R2_aj = 1 - (1 - R2) * (n - 1) / gl
+
+    return {
+        "beta": beta, "se": se, "t": t_stat, "p": p_valor,
+        "R2": R2, "R2_aj": R2_aj, "s2": s2, "s": s, "n": n, "gl": gl,
+        "SCE": SCE, "SCT": SCT,
+    }
+
+
+def ajustar(path=CSV_PATH, chunksize=CHUNK_SIZE, n_workers=N_WORKERS, escenario=ESCENARIO):
+    """Ajuste completo: exploración, acumulación y resolución. Devuelve (resultado, nombres)."""
+    niveles, media_x = explorar_csv(path, chunksize, escenario)
+    sumas = acumular_sumas(path, niveles, media_x, chunksize, n_workers, escenario)
+    res = resolver_ols(*sumas)
+    res["media_x"] = media_x
+    return res, nombres_columnas(niveles)
+
+
+def main():
+    res, nombres = ajustar()
+
+    print("=== REGRESIÓN MÚLTIPLE OUT-OF-CORE ===")
+    print(f"Modelo: {RESPUESTA} ~ {NUMERICA} + {' + '.join(CATEGORICAS)} + interacciones")
+    print(f"({NUMERICA} centrado en x̄ = {res['media_x']:.4f})\n")
+
+    tabla = pd.DataFrame({
+        "coef": res["beta"],
+        "error_std": res["se"],
+        "t": res["t"],
+        "p_valor": res["p"],
+    }, index=nombres)
+    print(tabla.round(4).to_string(), "\n")
+
+    print("=== MEDIDAS DEL AJUSTE ===")
+    print(f"n                   = {res['n']}")
+    print(f"gl residuales       = {res['gl']}")
+    print(f"SCE (error)         = {res['SCE']:.4f}")
+    print(f"SCT (total)         = {res['SCT']:.4f}")
+    print(f"s² (varianza error) = {res['s2']:.6f}")
+    print(f"s  (desvío error)   = {res['s']:.6f}")
+    print(f"R²                  = {res['R2']:.4f}")
+    print(f"R² ajustado         = {res['R2_aj']:.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -22,33 +22,35 @@ import pandas as pd
 from scipy.stats import chi2
 import matplotlib.pyplot as plt
 
+import cache_resultados as cache
+
 CSV_PATH = "tomates_calidad.csv"
 ALFA = 0.05
 Q_CLASES = 6       # número de clases por cuantiles (ajustable)
 
-def main():
+def calcular_homogeneidad(path=CSV_PATH, q_clases=Q_CLASES, alfa=ALFA):
+    """
+    Lee el CSV, arma la tabla de contingencia por cuantiles y calcula el
+    estadístico. Devuelve un dict con la tabla (O_ij), las esperadas (E_ij)
+    y los resultados del test.
+    """
     # Leer datos
-    df = pd.read_csv(CSV_PATH)
+    df = pd.read_csv(path)
     df = df.dropna(subset=["lote_proveedor", "diametro_mm"])
 
     # --- 1) Definir intervalos de diámetro POR CUANTILES ----------------
-    # Cada clase tendrá aproximadamente N / Q_CLASES observaciones
+    # Cada clase tendrá aproximadamente N / q_clases observaciones
     categorias = pd.qcut(
         df["diametro_mm"],
-        q=Q_CLASES,
+        q=q_clases,
         duplicates="drop"   # por si hay muchos empates
     )
 
     # --- 2) Tabla de contingencia: clases x productor -------------------
     tabla = pd.crosstab(categorias, df["lote_proveedor"])
 
-    print("=== Tabla de contingencia: diámetro (clases-cuantil) x productor (O_ij) ===")
-    print(tabla, "\n")
-
     O = tabla.values.astype(float)
     r, c = O.shape
-    productores = list(tabla.columns)
-    intervalos = tabla.index.astype(str).tolist()
 
     filas = O.sum(axis=1).reshape(-1, 1)   # totales por fila
     cols = O.sum(axis=0).reshape(1, -1)    # totales por columna
@@ -60,9 +62,35 @@ def main():
     # --- 4) Estadístico chi-cuadrado ------------------------------------
     chi2_stat = ((O - E) ** 2 / E).sum()
     gl = (r - 1) * (c - 1)
-    chi2_crit = chi2.ppf(1 - ALFA, gl)
+    chi2_crit = chi2.ppf(1 - alfa, gl)
     p_valor = chi2.sf(chi2_stat, gl)
 
+    return {
+        "tabla": tabla, "E": E, "chi2_stat": chi2_stat, "gl": gl,
+        "chi2_crit": chi2_crit, "p_valor": p_valor,
+    }
+
+def main():
+    # Resultado cacheado mientras no cambien el CSV, Q_CLASES ni ALFA
+    res = cache.memoizar(
+        "homogeneidad", CSV_PATH, {"q_clases": Q_CLASES, "alfa": ALFA},
+        calcular_homogeneidad, CSV_PATH, Q_CLASES, ALFA,
+    )
+    tabla, E = res["tabla"], res["E"]
+    chi2_stat, gl = res["chi2_stat"], res["gl"]
+    chi2_crit, p_valor = res["chi2_crit"], res["p_valor"]
+
+    print("=== Tabla de contingencia: diámetro (clases-cuantil) x productor (O_ij) ===")
+    print(tabla, "\n")
+
+    O = tabla.values.astype(float)
+    r, c = O.shape
+    productores = list(tabla.columns)
+    intervalos = tabla.index.astype(str).tolist()
+
+    filas = O.sum(axis=1).reshape(-1, 1)   # totales por fila
+    N = O.sum()
+
     # --- 5) Construir tabla resumen Obs/Esp + totales -------------------
     filas_tabla = []
     for i in range(r):
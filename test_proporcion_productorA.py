@@ -16,6 +16,8 @@ Archivo esperado: "tomates_calidad.csv" en la misma carpeta, con columnas:
 import math
 import pandas as pd
 
+import modo_compacto
+
 CSV_PATH = "tomates_calidad.csv"
 P0 = 0.15          # proporción bajo H0
 ALFA = 0.05        # nivel de significación
@@ -29,14 +31,23 @@ def normal_cdf(z):
     return 0.5 * (1.0 + math.erf(z / math.sqrt(2.0)))
 
 def main():
-    # Leer base
-    df = pd.read_csv(CSV_PATH)
+    if modo_compacto.ACTIVO:
+        # defecto como bits empaquetados (ver modo_compacto.py)
+        df, defecto_bits, _ = modo_compacto.leer_csv_compacto(
+            CSV_PATH, usecols=["lote_proveedor", "defecto"])
+        es_A = (df["lote_proveedor"] == "A").values
+
+        n_A = int(es_A.sum())
+        x_A = modo_compacto.contar_verdaderos(defecto_bits, es_A)
+    else:
+        # Leer base
+        df = pd.read_csv(CSV_PATH)
 
-    # Filtrar solo productor A
-    df_A = df[df["lote_proveedor"] == "A"]
+        # Filtrar solo productor A
+        df_A = df[df["lote_proveedor"] == "A"]
 
-    n_A = len(df_A)
-    x_A = (df_A["defecto"] == "Sí").sum()
+        n_A = len(df_A)
+        x_A = (df_A["defecto"] == "Sí").sum()
     p_hat = x_A / n_A if n_A > 0 else float("nan")
 
     # Estadístico de prueba Z
@@ -6,11 +6,11 @@ Requisitos:
 - Columnas: al menos "id_tomate" y "diametro_mm".
 """
 
-import pandas as pd
+import overlays
 
 def main():
-    # Leer el CSV
-    df = pd.read_csv("tomates_calidad_regenerado.csv")
+    # Leer el CSV (con el peso_g regenerado por ajustar_regresion.py)
+    df = overlays.leer_csv(overlays.BASE_CSV, overlays.ESCENARIO_REGENERADO)
 
     # Ordenar por diámetro ascendente
     df_ordenado = df.sort_values(by="diametro_mm", ascending=True)
@@ -35,6 +35,8 @@ Notas:
 import pandas as pd
 import math
 
+import modo_compacto
+
 def central_moment(x, k):
     """m_k = (1/n) Σ (xi - x̄)^k"""
     n = len(x)
@@ -54,41 +56,57 @@ def kurtosis_excess_g2(x):
     return m4 / (m2 ** 2) - 3
 
 # --- Versiones ajustadas (opcional) ---
+def ajustar_g1(g1, n):
+    """G1 = sqrt(n*(n-1)) / (n-2) * g1"""
+    if n < 3:
+        return float("nan")
+    return math.sqrt(n*(n-1)) / (n-2) * g1
+
+def ajustar_g2(g2, n):
+    """G2 = [(n-1)/((n-2)(n-3))] * [(n+1)g2 + 6]"""
+    if n < 4:
+        return float("nan")
+    return ((n-1)/((n-2)*(n-3))) * ((n+1)*g2 + 6)
+
 def skewness_adjusted(x):
     """
     Asimetría ajustada tipo Fisher-Pearson:
     G1 = sqrt(n*(n-1)) / (n-2) * g1
     """
-    n = len(x)
-    g1 = skewness_g1(x)
-    if n < 3:
-        return float("nan")
-    return math.sqrt(n*(n-1)) / (n-2) * g1
+    return ajustar_g1(skewness_g1(x), len(x))
 
 def kurtosis_excess_adjusted(x):
     """
     Exceso de curtosis ajustado (unbiased approx):
     G2 = [(n-1)/((n-2)(n-3))] * [(n+1)g2 + 6]
     """
-    n = len(x)
-    g2 = kurtosis_excess_g2(x)
-    if n < 4:
-        return float("nan")
-    return ((n-1)/((n-2)*(n-3))) * ((n+1)*g2 + 6)
-
-
-def describe_shape(series, name):
-    x = series.dropna().tolist()
-    n = len(x)
-    mean = sum(x)/n
-    m2 = central_moment(x,2)
-    m3 = central_moment(x,3)
-    m4 = central_moment(x,4)
-
-    g1 = skewness_g1(x)
-    g2 = kurtosis_excess_g2(x)
-    G1 = skewness_adjusted(x)
-    G2 = kurtosis_excess_adjusted(x)
+    return ajustar_g2(kurtosis_excess_g2(x), len(x))
+
+
+def describe_shape(series, name, decimales=None):
+    if modo_compacto.es_compacta(series):
+        # modo compacto: momentos acumulados en float64 por bloques, sin
+        # pasar la columna a una lista de Python
+        x = series.dropna().values
+        n = len(x)
+        mean = modo_compacto.suma_por_bloques(lambda v: v, x, decimales=[decimales]) / n
+        m2, m3, m4 = (modo_compacto.momento_central(x, k, decimales) for k in (2, 3, 4))
+        g1 = m3 / (m2 ** 1.5)
+        g2 = m4 / (m2 ** 2) - 3
+        G1 = ajustar_g1(g1, n)
+        G2 = ajustar_g2(g2, n)
+    else:
+        x = series.dropna().tolist()
+        n = len(x)
+        mean = sum(x)/n
+        m2 = central_moment(x,2)
+        m3 = central_moment(x,3)
+        m4 = central_moment(x,4)
+
+        g1 = skewness_g1(x)
+        g2 = kurtosis_excess_g2(x)
+        G1 = skewness_adjusted(x)
+        G2 = kurtosis_excess_adjusted(x)
 
     print(f"\n=== {name} ===")
     print(f"n = {n}")
@@ -121,7 +139,12 @@ def describe_shape(series, name):
 
 if __name__ == "__main__":
     # Cambiá el path si el CSV está en otro lado
-    df = pd.read_csv("tomates_calidad.csv")
+    if modo_compacto.ACTIVO:
+        df, _, dec = modo_compacto.leer_csv_compacto(
+            "tomates_calidad.csv", usecols=["diametro_mm", "peso_g"])
+    else:
+        df = pd.read_csv("tomates_calidad.csv")
+        dec = {}
 
-    describe_shape(df["diametro_mm"], "Diámetro (mm)")
-    describe_shape(df["peso_g"], "Peso (g)")
+    describe_shape(df["diametro_mm"], "Diámetro (mm)", dec.get("diametro_mm"))
+    describe_shape(df["peso_g"], "Peso (g)", dec.get("peso_g"))
@@ -15,6 +15,10 @@ Con n >= 30 por grupo, la aproximación normal es muy buena.
 import math
 import pandas as pd
 import matplotlib.pyplot as plt
+from matplotlib import cbook
+
+import cache_resultados as cache
+import modo_compacto
 
 # --- Parámetros generales ---
 CSV_PATH = "tomates_calidad.csv"
@@ -22,21 +26,26 @@ CONF_LEVEL = 0.95
 Z_95 = 1.96  # cuantíl aproximado para 95% (N(0,1))
 
 # --- Funciones auxiliares ---
-def ci_media_z(serie, z=Z_95):
+def media_desvio(x, decimales=None):
+    """Media y desvío muestral (ddof=1); en float32 se acumula en float64."""
+    if modo_compacto.es_compacta(x):
+        return modo_compacto.media_y_desvio(x.values, decimales)
+    return x.mean(), x.std(ddof=1)
+
+def ci_media_z(serie, z=Z_95, decimales=None):
     """
     Calcula IC para la media usando distribución normal (z).
     Devuelve (media, inf, sup, n, s).
     """
     x = serie.dropna()
     n = len(x)
-    mean = x.mean()
-    s = x.std(ddof=1)  # desviación estándar muestral
+    mean, s = media_desvio(x, decimales)  # s: desviación estándar muestral
     se = s / math.sqrt(n)  # error estándar
     ci_inf = mean - z * se
     ci_sup = mean + z * se
     return mean, ci_inf, ci_sup, n, s
 
-def ci_dif_medias_z(serie1, serie2, z=Z_95):
+def ci_dif_medias_z(serie1, serie2, z=Z_95, decimales=None):
     """
     IC del 95% para la diferencia de medias: mu1 - mu2, usando aproximación normal.
 
@@ -49,8 +58,8 @@ def ci_dif_medias_z(serie1, serie2, z=Z_95):
     x2 = serie2.dropna()
 
     n1, n2 = len(x1), len(x2)
-    m1, m2 = x1.mean(), x2.mean()
-    s1, s2 = x1.std(ddof=1), x2.std(ddof=1)
+    m1, s1 = media_desvio(x1, decimales)
+    m2, s2 = media_desvio(x2, decimales)
 
     diff = m1 - m2
     se_diff = math.sqrt(s1**2 / n1 + s2**2 / n2)
@@ -59,21 +68,44 @@ def ci_dif_medias_z(serie1, serie2, z=Z_95):
 
     return diff, ci_inf, ci_sup, (m1, s1, n1), (m2, s2, n2)
 
-# --- Cargar datos ---
-df = pd.read_csv(CSV_PATH)
-
-# Filtrar por turno
-peso_maniana = df.loc[df["turno"] == "Mañana", "peso_g"]
-peso_tarde   = df.loc[df["turno"] == "Tarde",  "peso_g"]
+def calcular_intervalos(path=CSV_PATH, z=Z_95):
+    """
+    Lee el CSV y calcula los IC por turno y el IC de la diferencia.
+    Devuelve (ic_maniana, ic_tarde, ic_diferencia, cajas), donde cajas son
+    los resúmenes del boxplot por turno (cuartiles, bigotes, atípicos).
+    """
+    decimales = None
+    if modo_compacto.ACTIVO:
+        df, _, dec = modo_compacto.leer_csv_compacto(path, usecols=["turno", "peso_g"])
+        decimales = dec.get("peso_g")
+    else:
+        df = pd.read_csv(path)
+
+    # Filtrar por turno
+    peso_maniana = df.loc[df["turno"] == "Mañana", "peso_g"]
+    peso_tarde   = df.loc[df["turno"] == "Tarde",  "peso_g"]
+
+    return (
+        ci_media_z(peso_maniana, z, decimales),
+        ci_media_z(peso_tarde, z, decimales),
+        ci_dif_medias_z(peso_maniana, peso_tarde, z, decimales),
+        [dict(c, label=turno) for turno, grupo in df.groupby("turno")["peso_g"]
+         for c in cbook.boxplot_stats(grupo.dropna().values)],
+    )
+
+# --- Calcular (o recuperar de la caché si el CSV no cambió) ---
+ic_m, ic_t, ic_diff, cajas = cache.memoizar(
+    "intervalos", CSV_PATH,
+    {"conf_level": CONF_LEVEL, "z": Z_95, "grupo": "turno", "compacto": modo_compacto.ACTIVO},
+    calcular_intervalos, CSV_PATH, Z_95,
+)
 
 # --- IC para cada turno ---
-mean_m, ci_m_inf, ci_m_sup, n_m, s_m = ci_media_z(peso_maniana)
-mean_t, ci_t_inf, ci_t_sup, n_t, s_t = ci_media_z(peso_tarde)
+mean_m, ci_m_inf, ci_m_sup, n_m, s_m = ic_m
+mean_t, ci_t_inf, ci_t_sup, n_t, s_t = ic_t
 
 # --- IC para la diferencia de medias (Mañana - Tarde) ---
-diff_mt, ci_diff_inf, ci_diff_sup, stats_m, stats_t = ci_dif_medias_z(
-    peso_maniana, peso_tarde
-)
+diff_mt, ci_diff_inf, ci_diff_sup, stats_m, stats_t = ic_diff
 
 # --- Mostrar resultados numéricos en consola ---
 print("=== Intervalos de confianza 95% para la media de peso (g) ===")
@@ -96,10 +128,10 @@ print("  Si el IC está completamente por encima/debajo de 0, hay diferencia sig
 # --- Gráficas para interpretar el resultado ---
 
 # 1) Boxplot de peso por turno
+# (se dibuja con los resúmenes ya calculados, sin volver a leer el CSV)
 plt.figure(figsize=(6, 4))
-df.boxplot(column="peso_g", by="turno")
+plt.gca().bxp(cajas)
 plt.title("Peso de los tomates por turno")
-plt.suptitle("")  # quita el título automático de pandas
 plt.xlabel("Turno")
 plt.ylabel("Peso (g)")
 plt.tight_layout()